@@ -1,91 +1,524 @@
+import asyncio
+import csv
+import itertools
 import os
-from flask import Flask, render_template, request, jsonify
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import click
 import requests
+from flask import Blueprint, Flask, render_template, request, jsonify, has_app_context, stream_with_context
+import autocomplete_index
+import config
+import descriptions
+import fuzzy
+import genres
+import http_cache
+import json_codec
+import metrics
+import profiling
+import projection
+import spoiler_model
+import spoilers
+import tmdb_async
+import tmdb_client
+from cache import _error_name, cached, cached_async, flight_stats, response_cache
+from normalize import fold
+
+
+class TimedJSONProvider(json_codec.JSONProvider):
+    # Reports time spent encoding jsonify() bodies as json_serialize_seconds
+    def response(self, *args, **kwargs):
+        start = time.perf_counter()
+        response = super().response(*args, **kwargs)
+        metrics.SERIALIZE_SECONDS.observe((), time.perf_counter() - start)
+        return response
+
 
 app = Flask(__name__)
+app.json = TimedJSONProvider(app)
+app.config['SQLALCHEMY_DATABASE_URI'] = config.SQLALCHEMY_DATABASE_URI
+app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = config.SQLALCHEMY_TRACK_MODIFICATIONS
+
+# The shared TMDB cache table is only used when a database is configured
+if app.config['SQLALCHEMY_DATABASE_URI']:
+    from sqlalchemy.exc import SQLAlchemyError
+    from db_cache import DatabaseStore
+    from models import CuratedDescription, db
+
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+    response_cache.second_tier = DatabaseStore()
+
+    def load_curated_rows():
+        if not has_app_context():
+            return None
+        try:
+            return db.session.execute(db.select(
+                CuratedDescription.media_type,
+                CuratedDescription.tmdb_id,
+                CuratedDescription.language,
+                CuratedDescription.description
+            )).all()
+        except SQLAlchemyError:
+            db.session.rollback()
+            return None
+
+    @app.cli.command('prune-cache')
+    def prune_cache():
+        print(f"Removed {DatabaseStore().prune()} expired cache rows.")
+else:
+    load_curated_rows = None
 
 TMDB_API_KEY = os.environ.get('TMDB_API_KEY')
-TMDB_BASE_URL = "https://api.themoviedb.org/3"
-
-def generate_custom_description(title, media_type, tmdb_overview):
-    descriptions = {
-        "Game of Thrones": "Yedi krallığın kontrolü için mücadele eden aileler, entrikalar, savaşlar ve ejderhalar. Epik bir fantezi dünyasında geçen bu dizi, izleyiciyi büyüleyici bir maceraya sürüklüyor.",
-        "Stranger Things": "1980'lerde geçen bu dizi, küçük bir kasabada kaybolan bir çocuğu arayan arkadaşlarının, doğaüstü güçlere sahip gizemli bir kızla tanışmasını konu alıyor.",
-        "The Crown": "İngiliz Kraliyet ailesinin yaşamını ve kraliçe II. Elizabeth'in hükümdarlığını konu alan tarihi bir drama.",
-        "Black Mirror": "Teknolojinin insan hayatı üzerindeki karanlık ve beklenmedik etkilerini işleyen, her bölümü bağımsız bir hikaye anlatan bilim kurgu antoloji dizisi.",
-        "Inception": "Rüyalara girip bilinçaltından bilgi çalabilen bir hırsızın, bir CEO'nun zihnine bir fikir yerleştirme görevini konu alan, zihin bükücü bir bilim kurgu filmi.",
-        "The Shawshank Redemption": "Haksız yere müebbet hapse mahkum edilen bir bankacının, hapishane yaşamı ve özgürlük arayışını anlatan, umut ve dostluk temalı bir dram filmi.",
-        "Pulp Fiction": "İç içe geçmiş hikayeleriyle, Los Angeles'ın yeraltı dünyasından çeşitli karakterlerin hayatlarını konu alan, kült statüsüne ulaşmış bir suç filmi.",
-        "The Matrix": "Gerçek dünyanın aslında bir simülasyon olduğunu keşfeden bir bilgisayar programcısının, insanlığı kurtarma mücadelesini anlatan devrim niteliğinde bir bilim kurgu filmi.",
-        "Forrest Gump": "Saf ve iyi kalpli bir adamın, 20. yüzyılın önemli olaylarına tanıklık ederken yaşadığı olağanüstü hayat hikayesini anlatan, duygu yüklü bir komedi-dram filmi."
-    }
-    custom_description = descriptions.get(title)
+# Point at a local stub (see stub_tmdb.py) for offline and load testing
+TMDB_BASE_URL = os.environ.get('TMDB_BASE_URL', "https://api.themoviedb.org/3")
+
+# Built offline from TMDB's daily ID exports with `flask build-autocomplete-index`
+AUTOCOMPLETE_INDEX_PATH = os.environ.get(
+    'AUTOCOMPLETE_INDEX_PATH',
+    os.path.join(app.root_path, 'data', 'autocomplete_index.json.gz')
+)
+local_index = None
+if os.path.exists(AUTOCOMPLETE_INDEX_PATH):
+    local_index = autocomplete_index.PrefixIndex.load(AUTOCOMPLETE_INDEX_PATH)
+
+# Known titles for typo correction: the exported catalogue when present, plus
+# every title /search has resolved in this worker
+title_matcher = fuzzy.TitleMatcher()
+
+@app.before_request
+def load_title_index():
+    # Indexing a catalogue takes seconds, so each worker does it in the
+    # background from its first request rather than at import (gunicorn
+    # --preload workers would not inherit a thread started there)
+    if local_index is not None:
+        title_matcher.load_in_background(lambda: zip(local_index.titles, local_index.popularity))
+
+@app.cli.command('build-autocomplete-index')
+@click.argument('exports', nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+@click.option('--output', default=AUTOCOMPLETE_INDEX_PATH, show_default=True)
+@click.option('--min-popularity', default=0.0, show_default=True)
+def build_autocomplete_index(exports, output, min_popularity):
+    index = autocomplete_index.build(exports, min_popularity)
+    index.save(output)
+    print(f"Indexed {len(index)} titles into {output}.")
+
+# Curated spoiler-free descriptions keyed by TMDB id, editable without a deploy
+curated_descriptions = descriptions.DescriptionStore(
+    os.environ.get('DESCRIPTIONS_PATH', os.path.join(app.root_path, 'data', 'descriptions.json')),
+    load_rows=load_curated_rows
+)
+if load_curated_rows is not None:
+    with app.app_context():
+        curated_descriptions.reload()
+
+# Spoiler terms for every title plus per-title ones keyed by "media_type:id"
+spoiler_lexicon = spoilers.SpoilerLexicon.load(
+    os.environ.get('SPOILER_TERMS_PATH', os.path.join(app.root_path, 'data', 'spoiler_terms.json'))
+)
+
+# Optional learned filter (needs NumPy and a model trained with
+# `flask train-spoiler-model`); when present it decides which overview
+# sentences are kept instead of the fixed first-three rule
+SPOILER_MODEL_PATH = os.environ.get('SPOILER_MODEL_PATH', os.path.join(app.root_path, 'data', 'spoiler_model.npy'))
+SPOILER_MODEL_THRESHOLD = float(os.environ.get('SPOILER_MODEL_THRESHOLD', '0.5'))
+spoiler_classifier = spoiler_model.load_if_available(SPOILER_MODEL_PATH)
+
+@app.cli.command('train-spoiler-model')
+@click.argument('examples', type=click.Path(exists=True, dir_okay=False))
+@click.option('--output', default=SPOILER_MODEL_PATH, show_default=True)
+@click.option('--features', default=spoiler_model.DEFAULT_FEATURES, show_default=True)
+@click.option('--epochs', default=300, show_default=True)
+def train_spoiler_model(examples, output, features, epochs):
+    if spoiler_model.np is None:
+        raise click.ClickException('Training the spoiler model requires NumPy.')
+    weights = spoiler_model.train(list(spoiler_model.read_examples(examples)), features, epochs)
+    spoiler_model.np.save(output, weights)
+    print(f"Saved {len(weights) - 1} feature weights to {output}.")
+
+def generate_custom_description(tmdb_id, media_type, tmdb_overview):
+    custom_description = curated_descriptions.get(media_type, tmdb_id)
     if custom_description:
         return custom_description
-    elif tmdb_overview:
-        # Limit the TMDB overview to 2-3 sentences to avoid potential spoilers
-        sentences = tmdb_overview.split('.')
-        limited_overview = '.'.join(sentences[:3]) + '.'
+    # Limit the TMDB overview to 2-3 sentences, skipping any that name a
+    # spoiler term, to avoid potential spoilers
+    if not tmdb_overview:
+        limited_overview = ''
+    elif spoiler_classifier is not None:
+        limited_overview = ' '.join(spoiler_classifier.keep_safe(
+            list(spoiler_lexicon.safe_sentences(tmdb_overview, media_type, tmdb_id)),
+            SPOILER_MODEL_THRESHOLD
+        ))
+    else:
+        limited_overview = spoiler_lexicon.scrub(tmdb_overview, media_type, tmdb_id, limit=3)
+    if limited_overview:
+        if not limited_overview.endswith(('.', '!', '?', '…', '"', '”')):
+            limited_overview += '.'
         return limited_overview
     else:
         return f"Bu {'dizi' if media_type == 'tv' else 'film'} hakkında kısa ve spoiler içermeyen bir açıklama bulunmuyor."
 
+def complete_search_hit(result, genre_tables=None):
+    # Genre names come from the cached genre tables, so /search makes a
+    # single upstream call. Movie taglines are only in the detail record;
+    # the page loads them lazily through /details.
+    if result['media_type'] in ['movie', 'tv']:
+        if genre_tables is not None:
+            table = genre_tables.get(result['media_type'])
+            if table is not None:
+                result['genres'] = [table[genre_id] for genre_id in result.get('genre_ids', []) if genre_id in table]
+        else:
+            add_genre_names(result)
+        if result['media_type'] == 'tv':
+            result['tagline'] = result.get('name', '')
+
+    for title in {result.get('title') or result.get('name'), result.get('original_title') or result.get('original_name')}:
+        if title:
+            title_matcher.add(title, result.get('popularity') or 0.0)
+    return result
+
+def add_genre_names(result):
+    # Leaves 'genres' unset when no genre table is available
+    names = genres.genre_names(TMDB_BASE_URL, TMDB_API_KEY, result['media_type'], result.get('genre_ids', []))
+    if names is not None:
+        result['genres'] = names
+
+@cached('search', empty=dict)
+def fetch_search_hit(query):
+    search_url = f"{TMDB_BASE_URL}/search/multi"
+    params = {
+        'api_key': TMDB_API_KEY,
+        'query': query,
+        'language': 'tr-TR'
+    }
+    # A failed call raises, so {} always means TMDB has no match
+    data = tmdb_client.json_body(tmdb_client.get(search_url, params=params))
+    if data is None:
+        return None
+    return complete_search_hit(data['results'][0]) if data['results'] else {}
+
 def search_external_api(query):
+    return describe_search_hit(fetch_search_hit(query))
+
+def describe_search_hit(hit):
+    if not hit:
+        return None
+    # The cached hit keeps TMDB's overview; the description is chosen per call
+    # so curated edits apply immediately
+    result = dict(hit)
+    if 'genres' not in result and result['media_type'] in ['movie', 'tv']:
+        # Cached while the genre tables were unavailable
+        add_genre_names(result)
+    result['overview'] = generate_custom_description(
+        result.get('id'),
+        result['media_type'],
+        hit.get('overview', '')
+    )
+    return result
+
+def resolve_title(query):
+    # Returns (result, the query that was searched)
+    result = search_external_api(query)
+    if result is not None or not query:
+        return result, query
+    # TMDB has nothing for the query as typed: retry once with the closest
+    # title this worker knows, so typos still find their film. A misspelling
+    # costs two upstream calls the first time it is seen; repeats are
+    # answered by the negative filter and the cached corrected hit.
+    corrected = correct_title(query)
+    if corrected is None:
+        return None, query
+    return search_external_api(corrected), corrected
+
+def correct_title(query):
+    match = title_matcher.match(query, loose=True)
+    if match is None or match[0] == query:
+        return None
+    return match[0]
+
+@cached('autocomplete', empty=list)
+def fetch_suggestions(query):
     search_url = f"{TMDB_BASE_URL}/search/multi"
     params = {
         'api_key': TMDB_API_KEY,
         'query': query,
         'language': 'tr-TR'
     }
-    response = requests.get(search_url, params=params)
+    try:
+        response = tmdb_client.get(search_url, params=params)
+    except requests.RequestException as error:
+        # Suggestions are best-effort: answer with none rather than an error
+        app.logger.warning('Suggestions for %r failed: %s', query, _error_name(error))
+        return None
     if response.status_code == 200:
-        results = response.json()['results']
-        if results:
-            result = results[0]
-            # Get the TMDB overview
-            tmdb_overview = result.get('overview', '')
-            # Generate a custom or limited description
-            result['overview'] = generate_custom_description(
-                result.get('title') or result.get('name'),
-                result['media_type'],
-                tmdb_overview
-            )
-            
-            # Include genre information
-            if result['media_type'] in ['movie', 'tv']:
-                genre_url = f"{TMDB_BASE_URL}/{result['media_type']}/{result['id']}"
-                genre_params = {
-                    'api_key': TMDB_API_KEY,
-                    'language': 'tr-TR'
-                }
-                genre_response = requests.get(genre_url, params=genre_params)
-                if genre_response.status_code == 200:
-                    genre_data = genre_response.json()
-                    result['genres'] = [genre['name'] for genre in genre_data.get('genres', [])]
-                    
-                    # Add tagline for movies or name for TV shows
-                    if result['media_type'] == 'movie':
-                        result['tagline'] = genre_data.get('tagline', '')
-                    else:
-                        result['tagline'] = genre_data.get('name', '')
-            
-            return result
+        return suggestions_from_results(json_codec.response_json(response)['results'])
     return None
 
+def suggestions_from_results(results):
+    # The same title often comes back as both a movie and a show
+    suggestions, seen = [], set()
+    for result in results:
+        title = result['title'] if 'title' in result else result['name']
+        key = fold(title)
+        if key not in seen:
+            seen.add(key)
+            suggestions.append(title)
+        if len(suggestions) == 5:
+            break
+    return suggestions
+
+@cached('details')
+def fetch_details(media_type, id):
+    details_url = f"{TMDB_BASE_URL}/{media_type}/{id}"
+    params = {
+        'api_key': TMDB_API_KEY,
+        'language': 'tr-TR'
+    }
+    # None when TMDB has no such title; a failed call raises
+    details = tmdb_client.json_body(tmdb_client.get(details_url, params=params))
+    return projection.trim(details, media_type) if details is not None else None
+
+# Per-thread request start time for the route histograms; cheaper to reach
+# than g, which goes through the context-local proxies
+_request_clock = threading.local()
+
+# Opt-in request profiling, off unless PROFILE_ENABLED=1 or switched on at
+# runtime with `flask profiling --enable`
+request_profiler = profiling.RequestProfiler(enabled=os.environ.get('PROFILE_ENABLED') == '1')
+
+@app.cli.command('profiling')
+@click.option('--enable/--disable', default=None, help='Turn request profiling on or off in every worker.')
+@click.option('--sample-rate', type=float, help='Share of requests to run under cProfile.')
+@click.option('--slow-seconds', type=float, help='Keep stack samples of requests slower than this; 0 turns it off.')
+def configure_profiling(enable, sample_rate, slow_seconds):
+    settings = {'enabled': enable, 'sample_rate': sample_rate, 'slow_seconds': slow_seconds}
+    request_profiler.write_control(**{name: value for name, value in settings.items() if value is not None})
+    print(f"Wrote {request_profiler.control_path}; workers pick it up within "
+          f"{profiling.CONTROL_POLL_SECONDS:.0f}s and write profiles to {request_profiler.directory}.")
+
+@app.before_request
+def start_request_profile():
+    request_profiler.start()
+    if request_profiler.enabled:
+        request_profiler.begin(f'{request.method} {request.path}')
+
+@app.teardown_request
+def finish_request_profile(exc):
+    request_profiler.end()
+
+@app.before_request
+def reset_upstream_timing():
+    tmdb_client.reset_timing()
+    _request_clock.started = time.perf_counter()
+
+@app.after_request
+def add_upstream_timing(response):
+    calls, seconds = tmdb_client.current_timing()
+    if calls:
+        response.headers['Server-Timing'] = f'tmdb;desc="{calls} calls";dur={seconds * 1000:.1f}'
+    return response
+
+@app.after_request
+def record_request_metrics(response):
+    started = getattr(_request_clock, 'started', None)
+    if started is not None:
+        current = request._get_current_object()
+        route = current.url_rule.rule if current.url_rule is not None else 'unmatched'
+        metrics.observe_request(route, current.method, response.status_code,
+                                time.perf_counter() - started, response.content_length)
+    return response
+
+# Registered after the metrics hook so it runs first and bytes are counted compressed
+app.after_request(http_cache.compress_response)
+
+@metrics.registry.collector
+def cache_metrics():
+    regions = response_cache.stats()
+    negatives = {endpoint: stats for endpoint, stats in regions.items() if 'negative_bytes' in stats}
+    flights = flight_stats()
+
+    def by_endpoint(source, field):
+        return {(endpoint,): stats[field] for endpoint, stats in source.items()}
+
+    return [
+        ('cache_hits_total', 'counter', 'In-memory response cache hits.', ('endpoint',),
+         by_endpoint(regions, 'hits')),
+        ('cache_misses_total', 'counter', 'In-memory response cache misses.', ('endpoint',), by_endpoint(regions, 'misses')),
+        ('cache_second_tier_hits_total', 'counter', 'Misses answered by the database tier.', ('endpoint',),
+         by_endpoint(regions, 'second_tier_hits')),
+        ('cache_stale_hits_total', 'counter', 'Expired entries served while a background refresh runs.',
+         ('endpoint',), by_endpoint(regions, 'stale_hits')),
+        ('cache_stale_if_error_hits_total', 'counter', 'Expired entries served because the refresh failed.',
+         ('endpoint',), by_endpoint(regions, 'stale_if_error_hits')),
+        ('cache_refreshes_total', 'counter', 'Background refreshes started.', ('endpoint',),
+         by_endpoint(regions, 'refreshes')),
+        ('negative_cache_hits_total', 'counter', 'No-result lookups answered by the negative filter.',
+         ('endpoint',), by_endpoint(regions, 'negative_hits')),
+        ('negative_cache_checks_total', 'counter', 'Negative hits re-checked upstream.', ('endpoint',),
+         by_endpoint(regions, 'negative_checks')),
+        ('negative_cache_false_positives_total', 'counter', 'Re-checked negative hits that had results.',
+         ('endpoint',), by_endpoint(regions, 'negative_false_positives')),
+        ('negative_cache_entries', 'gauge', 'Keys added to the live filter generations.', ('endpoint',),
+         by_endpoint(negatives, 'negative_entries')),
+        ('negative_cache_bytes', 'gauge', 'Memory held by the negative filters.', ('endpoint',),
+         by_endpoint(negatives, 'negative_bytes')),
+        ('negative_cache_false_positive_rate', 'gauge', 'Expected false-positive rate at the current fill.',
+         ('endpoint',), by_endpoint(negatives, 'negative_false_positive_rate')),
+        ('cache_evictions_total', 'counter', 'Entries evicted for space.', ('endpoint',),
+         by_endpoint(regions, 'evictions')),
+        ('cache_expirations_total', 'counter', 'Entries dropped after their TTL.', ('endpoint',),
+         by_endpoint(regions, 'expirations')),
+        ('cache_entries', 'gauge', 'Entries held in memory.', ('endpoint',), by_endpoint(regions, 'entries')),
+        ('cache_bytes', 'gauge', 'Approximate bytes held in memory.', ('endpoint',), by_endpoint(regions, 'bytes')),
+        ('singleflight_coalesced_total', 'counter', 'Cache misses that waited on an in-flight fetch.',
+         ('endpoint',), by_endpoint(flights, 'coalesced')),
+        ('singleflight_in_flight', 'gauge', 'Upstream fetches in flight.', ('endpoint',),
+         by_endpoint(flights, 'in_flight')),
+    ]
+
+@app.route('/metrics')
+def prometheus_metrics():
+    return metrics.registry.render(), 200, {'Content-Type': metrics.CONTENT_TYPE}
+
 @app.route('/')
 def index():
     return render_template('index.html')
 
-@app.route('/search', methods=['POST'])
+# GET /search?query= can be cached by browsers and CDNs; POST with a JSON
+# body is kept for older clients
+@app.route('/search', methods=['GET', 'POST'])
 def search():
-    query = request.json.get('query')
+    if request.method == 'GET':
+        query = request.args.get('query', '')
+    else:
+        query = request.json.get('query')
     
-    result = search_external_api(query)
+    try:
+        result, searched = resolve_title(query)
+    except requests.RequestException as error:
+        app.logger.warning('Search for %r failed: %s', query, _error_name(error))
+        return http_cache.uncached_error('TMDB request failed', 502)
     
     if result:
-        return jsonify(result)
+        # The overview and any late-filled genres are chosen per call, so they
+        # are part of the validator along with the cached hit's digest
+        hit_etag = fetch_search_hit.etag(searched)
+        validator = http_cache.etag(hit_etag, result['overview'], *result.get('genres', ())) if hit_etag else None
+        return http_cache.json_response('search', result, validator)
     
-    return jsonify({'error': 'No results found'}), 404
+    return http_cache.json_response('search', {'error': 'No results found'}, status=404)
+
+# POST /search/bulk resolves a watchlist (one title per line, or CSV with a
+# title or name column) the same way /search does and streams one NDJSON
+# line per title, in completion order, then a summary line. Each line has
+# status 200, 404 when TMDB has no match, or 502 when the call failed. The
+# body is read as titles are needed and at most 2 * BULK_SEARCH_CONCURRENCY
+# are in flight per request, so memory stays flat however long the list is.
+BULK_SEARCH_MAX_TITLES = int(os.environ.get('BULK_SEARCH_MAX_TITLES', '5000'))
+BULK_SEARCH_CONCURRENCY = int(os.environ.get('BULK_SEARCH_CONCURRENCY', '8'))
+BULK_SEARCH_MAX_LINE_BYTES = 1024
+
+_bulk_search_pool = ThreadPoolExecutor(max_workers=BULK_SEARCH_CONCURRENCY, thread_name_prefix='bulk-search')
+
+def upload_lines(stream):
+    # Decoded lines of an upload, one read at a time; over-long lines are cut short
+    first = True
+    while True:
+        line = stream.readline(BULK_SEARCH_MAX_LINE_BYTES)
+        if not line:
+            return
+        if len(line) == BULK_SEARCH_MAX_LINE_BYTES and not line.endswith(b'\n'):
+            rest = line
+            while rest and not rest.endswith(b'\n'):
+                rest = stream.readline(BULK_SEARCH_MAX_LINE_BYTES)
+        text = line.decode('utf-8', errors='replace')
+        yield text.lstrip('\ufeff') if first else text
+        first = False
+
+def watchlist_titles(lines, csv_format):
+    """(line number, title) for each entry of a watchlist."""
+    if not csv_format:
+        for number, line in enumerate(lines, 1):
+            if line.strip():
+                yield number, line.strip()
+        return
+    rows = csv.reader(lines)
+    column = 0
+    for row in rows:
+        if rows.line_num == 1:
+            header = [fold(cell) for cell in row]
+            found = next((header.index(name) for name in ('title', 'name') if name in header), None)
+            if found is not None:
+                column = found
+                continue
+        if column < len(row) and row[column].strip():
+            yield rows.line_num, row[column].strip()
+
+def resolve_title_for_bulk(query):
+    # Runs on the bulk search pool; the app context gives it the database tier
+    with app.app_context():
+        try:
+            return resolve_title(query)[0]
+        except Exception as error:
+            return error
+
+def bulk_search_lines(titles):
+    titles = iter(titles)
+    pending = {}
+    counts = {'resolved': 0, 'not_found': 0, 'failed': 0}
+    try:
+        for title in itertools.chain(itertools.islice(titles, BULK_SEARCH_MAX_TITLES), [None]):
+            if title is not None:
+                pending[_bulk_search_pool.submit(resolve_title_for_bulk, title[1])] = title
+                if len(pending) < 2 * BULK_SEARCH_CONCURRENCY:
+                    continue
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    line, query = pending.pop(future)
+                    item = {'line': line, 'query': query}
+                    result = future.result()
+                    if isinstance(result, Exception):
+                        app.logger.warning('Bulk search of %r failed: %s', query, _error_name(result))
+                        item.update(status=502, error='TMDB request failed')
+                        counts['failed'] += 1
+                    elif result:
+                        item.update(status=200, result=result)
+                        counts['resolved'] += 1
+                    else:
+                        item.update(status=404, error='No results found')
+                        counts['not_found'] += 1
+                    yield json_codec.dumps(item) + b'\n'
+                if title is not None:
+                    break
+        summary = {'done': True, **counts, 'truncated': next(titles, None) is not None}
+        yield json_codec.dumps(summary) + b'\n'
+    finally:
+        # The client went away: drop the titles that have not started
+        for future in pending:
+            future.cancel()
+
+@app.route('/search/bulk', methods=['POST'])
+def search_bulk():
+    upload = request.files.get('file') if request.mimetype == 'multipart/form-data' else None
+    stream = upload.stream if upload is not None else request.stream
+    list_format = request.args.get('format')
+    if list_format is None:
+        if upload is not None:
+            csv_upload = upload.mimetype == 'text/csv' or (upload.filename or '').lower().endswith('.csv')
+        else:
+            csv_upload = request.mimetype == 'text/csv'
+        list_format = 'csv' if csv_upload else 'lines'
+    if list_format not in ('csv', 'lines'):
+        return jsonify({'error': 'format must be csv or lines'}), 400
+
+    titles = watchlist_titles(upload_lines(stream), list_format == 'csv')
+    response = app.response_class(stream_with_context(bulk_search_lines(titles)), mimetype='application/x-ndjson')
+    # Ask proxies to pass lines through as they are written
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
 
 @app.route('/autocomplete', methods=['GET'])
 def autocomplete():
@@ -93,41 +526,270 @@ def autocomplete():
     if len(query) < 2:
         return jsonify([])
 
-    search_url = f"{TMDB_BASE_URL}/search/multi"
-    params = {
-        'api_key': TMDB_API_KEY,
-        'query': query,
-        'language': 'tr-TR'
-    }
-    response = requests.get(search_url, params=params)
-    
-    if response.status_code == 200:
-        results = response.json()['results']
-        suggestions = [result['title'] if 'title' in result else result['name'] for result in results[:5]]
-        
+    # Answer from the local index when it has matches; fall back to TMDB
+    suggestions = local_index.suggest(query) if local_index is not None else None
+    if not suggestions:
+        suggestions = fetch_suggestions(query)
+
+    if suggestions is not None:
         # Return an empty list if the query matches a full title
-        if query in suggestions:
-            return jsonify([])
+        if fold(query) in {fold(suggestion) for suggestion in suggestions}:
+            suggestions = []
         
-        return jsonify(suggestions)
+        return http_cache.json_response('autocomplete', suggestions, http_cache.etag(*suggestions))
     
     return jsonify([])
 
 @app.route('/details/<id>', methods=['GET'])
 def get_details(id):
     media_type = request.args.get('media_type', 'movie')
-    details_url = f"{TMDB_BASE_URL}/{media_type}/{id}"
-    params = {
-        'api_key': TMDB_API_KEY,
-        'language': 'tr-TR'
-    }
-    response = requests.get(details_url, params=params)
+    try:
+        fields = projection.parse_fields(request.args.get('fields'))
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
+    try:
+        details = fetch_details(media_type, id)
+    except requests.RequestException as error:
+        app.logger.warning('Details fetch of %s/%s failed: %s', media_type, id, _error_name(error))
+        return http_cache.uncached_error('TMDB request failed', 502)
     
-    if response.status_code == 200:
-        details = response.json()
-        return jsonify(details)
+    if details:
+        entry_etag = fetch_details.etag(media_type, id)
+        validator = http_cache.etag(entry_etag, *fields) if entry_etag else None
+        if fields == tuple(projection.ALLOWED):
+            # The whole cached document: serve its stored compressed bytes
+            return http_cache.json_response(
+                'details', details, validator,
+                encoded=lambda encoding: fetch_details.encoded(encoding, media_type, id)
+            )
+        return http_cache.json_response('details', projection.select(details, fields), validator)
     
     return jsonify({'error': 'Details not found'}), 404
 
+# POST /details/batch with {"items": [{"media_type": "movie", "id": 27205}, ...],
+# "fields": "..."} returns one result per item, in order, each with its own
+# status. Cache hits are answered inline; misses are fetched on a shared
+# pool, so at most DETAILS_BATCH_CONCURRENCY upstream calls per worker are
+# in flight for batches however many arrive at once.
+DETAILS_BATCH_MAX_ITEMS = int(os.environ.get('DETAILS_BATCH_MAX_ITEMS', '50'))
+DETAILS_BATCH_CONCURRENCY = int(os.environ.get('DETAILS_BATCH_CONCURRENCY', '8'))
+
+_details_batch_pool = ThreadPoolExecutor(max_workers=DETAILS_BATCH_CONCURRENCY, thread_name_prefix='details-batch')
+
+def parse_details_batch(body):
+    """(media_type, id) pairs, None for malformed items, and the fields to return.
+
+    Raises ValueError if the batch itself is unusable.
+    """
+    items = body.get('items') if isinstance(body, dict) else None
+    if not isinstance(items, list) or not items:
+        raise ValueError('items must be a non-empty list')
+    if len(items) > DETAILS_BATCH_MAX_ITEMS:
+        raise ValueError(f'At most {DETAILS_BATCH_MAX_ITEMS} items per batch')
+    pairs = []
+    for item in items:
+        media_type = item.get('media_type', 'movie') if isinstance(item, dict) else None
+        id = str(item.get('id', '')) if isinstance(item, dict) else ''
+        pairs.append((media_type, id) if media_type in ('movie', 'tv') and id.isdigit() else None)
+    fields = body.get('fields')
+    if isinstance(fields, list) and all(isinstance(field, str) for field in fields):
+        fields = ','.join(fields)
+    elif fields is not None and not isinstance(fields, str):
+        raise ValueError('fields must be a string or a list of strings')
+    return pairs, projection.parse_fields(fields)
+
+def details_batch_results(pairs, outcomes, fields):
+    # outcomes maps each valid pair to its details, None, or the exception its fetch raised
+    results = []
+    for pair in pairs:
+        if pair is None:
+            results.append({'status': 400, 'error': 'Each item needs a numeric id and a media_type of movie or tv'})
+            continue
+        result = {'media_type': pair[0], 'id': int(pair[1])}
+        details = outcomes[pair]
+        if isinstance(details, Exception):
+            result.update(status=502, error='TMDB request failed')
+        elif details:
+            result.update(status=200, details=projection.select(details, fields))
+        else:
+            result.update(status=404, error='Details not found')
+        results.append(result)
+    return {'results': results}
+
+def fetch_details_for_batch(media_type, id):
+    # Runs on the batch pool; returns the upstream timing for the request thread.
+    # The app context lets misses reach the shared database tier.
+    tmdb_client.reset_timing()
+    with app.app_context():
+        try:
+            return fetch_details(media_type, id), tmdb_client.current_timing()
+        except Exception as error:
+            return error, tmdb_client.current_timing()
+
+@app.route('/details/batch', methods=['POST'])
+def get_details_batch():
+    try:
+        pairs, fields = parse_details_batch(request.get_json(silent=True))
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
+
+    outcomes, pending = {}, {}
+    for pair in pairs:
+        if pair is None or pair in outcomes or pair in pending:
+            continue
+        if fetch_details.is_cached(*pair):
+            # The entry can still expire or be evicted before it is read
+            try:
+                outcomes[pair] = fetch_details(*pair)
+            except Exception as error:
+                outcomes[pair] = error
+        else:
+            pending[pair] = _details_batch_pool.submit(fetch_details_for_batch, *pair)
+    for pair, future in pending.items():
+        outcomes[pair], timing = future.result()
+        tmdb_client.add_timing(*timing)
+    for pair, outcome in outcomes.items():
+        if isinstance(outcome, Exception):
+            app.logger.warning('Batch details fetch of %s/%s failed: %s', *pair, _error_name(outcome))
+
+    return jsonify(details_batch_results(pairs, outcomes, fields))
+
+# Async variants of the TMDB routes under /async. Flask runs async views
+# through asgiref (`pip install "flask[async]"`), so the routes are only
+# registered when it is installed; independent upstream lookups inside one
+# request run concurrently, each with its own deadline.
+try:
+    import asgiref
+except ImportError:
+    asgiref = None
+
+async_views = Blueprint('async_views', __name__, url_prefix='/async')
+
+async def genre_table_async(media_type):
+    try:
+        return await asyncio.wait_for(
+            asyncio.to_thread(genres.get_table, TMDB_BASE_URL, TMDB_API_KEY, media_type),
+            tmdb_async.DEADLINE
+        )
+    except asyncio.TimeoutError:
+        return None
+
+@cached_async('search', empty=dict)
+async def fetch_search_hit_async(query):
+    # Fetch both genre tables while the search is in flight instead of after it
+    data, movie_genres, tv_genres = await asyncio.gather(
+        tmdb_async.get_json(f"{TMDB_BASE_URL}/search/multi", {
+            'api_key': TMDB_API_KEY,
+            'query': query,
+            'language': 'tr-TR'
+        }),
+        genre_table_async('movie'),
+        genre_table_async('tv')
+    )
+    if data is None:
+        return None
+    if data.get('results'):
+        return complete_search_hit(data['results'][0], {'movie': movie_genres, 'tv': tv_genres})
+    return {}
+
+@cached_async('autocomplete', empty=list)
+async def fetch_suggestions_async(query):
+    try:
+        data = await tmdb_async.get_json(f"{TMDB_BASE_URL}/search/multi", {
+            'api_key': TMDB_API_KEY,
+            'query': query,
+            'language': 'tr-TR'
+        })
+    except tmdb_async.ERRORS as error:
+        app.logger.warning('Suggestions for %r failed: %s', query, _error_name(error))
+        return None
+    if data is None:
+        return None
+    return suggestions_from_results(data['results'])
+
+@cached_async('details')
+async def fetch_details_async(media_type, id):
+    details = await tmdb_async.get_json(f"{TMDB_BASE_URL}/{media_type}/{id}", {
+        'api_key': TMDB_API_KEY,
+        'language': 'tr-TR'
+    })
+    return projection.trim(details, media_type) if details is not None else None
+
+@async_views.route('/search', methods=['POST'])
+async def search_async():
+    query = request.json.get('query')
+    try:
+        result = describe_search_hit(await fetch_search_hit_async(query))
+        corrected = correct_title(query) if result is None and query else None
+        if corrected is not None:
+            result = describe_search_hit(await fetch_search_hit_async(corrected))
+    except tmdb_async.ERRORS as error:
+        app.logger.warning('Search for %r failed: %s', query, _error_name(error))
+        return http_cache.uncached_error('TMDB request failed', 502)
+
+    if result:
+        return jsonify(result)
+
+    return jsonify({'error': 'No results found'}), 404
+
+@async_views.route('/autocomplete', methods=['GET'])
+async def autocomplete_async():
+    query = request.args.get('query', '')
+    if len(query) < 2:
+        return jsonify([])
+
+    suggestions = local_index.suggest(query) if local_index is not None else None
+    if not suggestions:
+        suggestions = await fetch_suggestions_async(query)
+
+    if suggestions and fold(query) not in {fold(suggestion) for suggestion in suggestions}:
+        return jsonify(suggestions)
+
+    return jsonify([])
+
+@async_views.route('/details/<id>', methods=['GET'])
+async def get_details_async(id):
+    media_type = request.args.get('media_type', 'movie')
+    try:
+        fields = projection.parse_fields(request.args.get('fields'))
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
+    try:
+        details = await fetch_details_async(media_type, id)
+    except tmdb_async.ERRORS as error:
+        app.logger.warning('Details fetch of %s/%s failed: %s', media_type, id, _error_name(error))
+        return http_cache.uncached_error('TMDB request failed', 502)
+
+    if details:
+        return jsonify(projection.select(details, fields))
+
+    return jsonify({'error': 'Details not found'}), 404
+
+@async_views.route('/details/batch', methods=['POST'])
+async def get_details_batch_async():
+    try:
+        pairs, fields = parse_details_batch(request.get_json(silent=True))
+    except ValueError as error:
+        return jsonify({'error': str(error)}), 400
+
+    # Each async request runs on its own event loop, so the limit is per batch
+    limit = asyncio.Semaphore(DETAILS_BATCH_CONCURRENCY)
+
+    async def fetch(pair):
+        if fetch_details_async.is_cached(*pair):
+            return await fetch_details_async(*pair)
+        async with limit:
+            return await fetch_details_async(*pair)
+
+    unique = list(dict.fromkeys(pair for pair in pairs if pair is not None))
+    outcomes = await asyncio.gather(*(fetch(pair) for pair in unique), return_exceptions=True)
+    for pair, outcome in zip(unique, outcomes):
+        if isinstance(outcome, Exception):
+            app.logger.warning('Batch details fetch of %s/%s failed: %s', *pair, _error_name(outcome))
+    return jsonify(details_batch_results(pairs, dict(zip(unique, outcomes)), fields))
+
+if asgiref is not None:
+    app.register_blueprint(async_views)
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000)
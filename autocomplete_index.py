@@ -0,0 +1,111 @@
+import gzip
+import heapq
+import json
+import os
+from array import array
+from bisect import bisect_left
+
+from normalize import fold
+
+# Prefixes up to this length get their top-k precomputed; they match too many
+# titles to rank at query time. Longer prefixes cover few enough titles to rank
+# on the fly.
+PRECOMPUTED_PREFIX_LENGTH = 3
+TOP_K = 5
+
+
+def _open(path, mode='rt'):
+    if path.endswith('.gz'):
+        return gzip.open(path, mode, encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def read_export(path, min_popularity=0.0):
+    """Yield (title, popularity) from a TMDB daily ID export (movie or tv)."""
+    with _open(path) as export:
+        for line in export:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if record.get('adult'):
+                continue
+            title = record.get('original_title') or record.get('original_name')
+            popularity = float(record.get('popularity') or 0.0)
+            if title and popularity >= min_popularity:
+                yield title, popularity
+
+
+class PrefixIndex:
+    """Sorted array of normalized titles with popularity-ranked top-k per prefix."""
+
+    def __init__(self, entries, top_k=TOP_K):
+        best = {}
+        for title, popularity in entries:
+            key = fold(title)
+            if not key:
+                continue
+            # The same title in several exports keeps its most popular entry
+            if key not in best or popularity > best[key][1]:
+                best[key] = (title, popularity)
+        self.keys = sorted(best)
+        self.titles = [best[key][0] for key in self.keys]
+        self.popularity = array('f', (best[key][1] for key in self.keys))
+        self.top_k = top_k
+        self.short_prefixes = self._precompute()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _rank(self, start, end):
+        popularity = self.popularity
+        return heapq.nlargest(self.top_k, range(start, end), key=popularity.__getitem__)
+
+    def _range(self, prefix):
+        start = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, prefix + '\uffff', start)
+        return start, end
+
+    def _precompute(self):
+        # Keys are sorted, so every prefix covers one contiguous run
+        table = {}
+        for length in range(1, PRECOMPUTED_PREFIX_LENGTH + 1):
+            start = 0
+            while start < len(self.keys):
+                prefix = self.keys[start][:length]
+                if len(prefix) < length:
+                    start += 1
+                    continue
+                end = bisect_left(self.keys, prefix + '\uffff', start)
+                table[prefix] = tuple(self._rank(start, end))
+                start = end
+        return table
+
+    def suggest(self, query, limit=TOP_K):
+        prefix = fold(query)
+        if not prefix:
+            return []
+        if len(prefix) <= PRECOMPUTED_PREFIX_LENGTH:
+            positions = self.short_prefixes.get(prefix, ())
+        else:
+            positions = self._rank(*self._range(prefix))
+        return [self.titles[position] for position in positions[:limit]]
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with gzip.open(path, 'wt', encoding='utf-8') as output:
+            json.dump({'titles': self.titles, 'popularity': self.popularity.tolist()}, output,
+                      ensure_ascii=False, separators=(',', ':'))
+
+    @classmethod
+    def load(cls, path, top_k=TOP_K):
+        with gzip.open(path, 'rt', encoding='utf-8') as data:
+            stored = json.load(data)
+        return cls(zip(stored['titles'], stored['popularity']), top_k=top_k)
+
+
+def build(paths, min_popularity=0.0):
+    def entries():
+        for path in paths:
+            yield from read_export(path, min_popularity)
+    return PrefixIndex(entries())
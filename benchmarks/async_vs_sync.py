@@ -0,0 +1,74 @@
+"""Side-by-side latency of the sync and async /search, /autocomplete, /details routes.
+
+Starts the local stub TMDB server (stub_tmdb.py) with fixed per-call latency and drives both
+route families through the Flask test client. The response cache and genre
+tables are cleared before every request so each one pays its full upstream
+cost. Async routes need asgiref
+(pip install "flask[async]").
+
+    python benchmarks/async_vs_sync.py [--latency-ms 50] [--requests 60] [--threads 1]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module  # noqa: E402
+import genres  # noqa: E402
+import stub_tmdb  # noqa: E402
+from cache import response_cache  # noqa: E402
+
+
+def cold():
+    response_cache.clear()
+    genres._tables.clear()
+    genres._loaded_at.clear()
+    genres._retry_at.clear()
+
+
+def drive(client, method, path, count, threads, body=None):
+    def one(_):
+        cold()
+        start = time.perf_counter()
+        response = client.open(path, method=method, json=body)
+        assert response.status_code == 200, response.status_code
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(threads) as pool:
+        return list(pool.map(one, range(count)))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--latency-ms', type=float, default=50)
+    parser.add_argument('--requests', type=int, default=60)
+    parser.add_argument('--threads', type=int, default=1)
+    args = parser.parse_args()
+
+    if 'async_views' not in app_module.app.blueprints:
+        sys.exit('asgiref is not installed, so the /async routes are not registered (pip install "flask[async]").')
+
+    server = stub_tmdb.start_in_thread(latency=f'fixed:{args.latency_ms}')
+    app_module.TMDB_BASE_URL = server.base_url
+    client = app_module.app.test_client()
+
+    cases = [
+        ('search', 'POST', '/search', '/async/search', {'query': 'inception'}),
+        ('autocomplete', 'GET', '/autocomplete?query=zzinc', '/async/autocomplete?query=zzinc', None),
+        ('details', 'GET', '/details/27205?media_type=movie', '/async/details/27205?media_type=movie', None),
+    ]
+    print(f"stub latency {args.latency_ms:.0f} ms, {args.requests} cold requests, {args.threads} threads")
+    for name, method, sync_path, async_path, body in cases:
+        for label, path in (('sync', sync_path), ('async', async_path)):
+            timings = sorted(drive(client, method, path, args.requests, args.threads, body))
+            p95 = timings[int(len(timings) * 0.95) - 1]
+            print(f"{name:<13} {label:<6} mean {statistics.mean(timings) * 1e3:7.1f} ms   p95 {p95 * 1e3:7.1f} ms")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
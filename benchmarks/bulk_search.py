@@ -0,0 +1,93 @@
+"""Resolving a watchlist: serial /search calls vs one streamed /search/bulk request.
+
+Builds watchlists from the stub fixture titles plus titles TMDB will not
+match, writes each to a temporary file that is streamed as the request
+body, and reports total time, time to the first NDJSON line and the peak
+Python heap (tracemalloc) while the response is consumed, for growing list
+sizes. The response cache is cleared before each run.
+
+    python benchmarks/bulk_search.py [--latency-ms 50] [--sizes 200,1000,5000] [--serial 200]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module  # noqa: E402
+import stub_tmdb  # noqa: E402
+from cache import response_cache  # noqa: E402
+
+
+def watchlist(size, seed):
+    rng = random.Random(seed)
+    titles = [detail.get('title') or detail.get('name') for detail in stub_tmdb.Catalogue().details.values()]
+    for _ in range(size):
+        if rng.random() < 0.7:
+            yield rng.choice(titles)
+        else:
+            yield ''.join(rng.choice('bcdfghjklmnpqrstvwxz') for _ in range(10))
+
+
+def bulk(client, size, seed):
+    with tempfile.TemporaryFile() as body:
+        for title in watchlist(size, seed):
+            body.write(title.encode('utf-8') + b'\n')
+        length = body.tell()
+        body.seek(0)
+        response_cache.clear()
+        tracemalloc.start()
+        start = time.perf_counter()
+        response = client.post('/search/bulk', input_stream=body, content_length=length,
+                               content_type='text/plain', buffered=False)
+        first, lines = None, 0
+        for chunk in response.response:
+            if first is None:
+                first = time.perf_counter() - start
+            lines += 1
+            summary = chunk
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        response.close()
+    assert lines == size + 1, (lines, size)
+    return elapsed, first, peak, json.loads(summary)
+
+
+def serial(client, size, seed):
+    response_cache.clear()
+    start = time.perf_counter()
+    for title in watchlist(size, seed):
+        client.post('/search', json={'query': title})
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--latency-ms', type=float, default=50)
+    parser.add_argument('--sizes', default='200,1000,5000')
+    parser.add_argument('--serial', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=5)
+    args = parser.parse_args()
+
+    server = stub_tmdb.start_in_thread(latency=f'fixed:{args.latency_ms}')
+    app_module.TMDB_BASE_URL = server.base_url
+    client = app_module.app.test_client()
+    print(f"stub latency {args.latency_ms:.0f} ms, bulk concurrency {app_module.BULK_SEARCH_CONCURRENCY}")
+
+    print(f"serial /search  {args.serial:5d} titles  {serial(client, args.serial, args.seed):7.2f} s")
+    for size in map(int, args.sizes.split(',')):
+        elapsed, first, peak, summary = bulk(client, size, args.seed)
+        print(f"/search/bulk    {size:5d} titles  {elapsed:7.2f} s   first line {first * 1000:6.1f} ms   "
+              f"peak heap {peak / 2**20:6.2f} MiB   {summary['resolved']} resolved, {summary['not_found']} not found, "
+              f"{summary['failed']} failed")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
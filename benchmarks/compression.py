@@ -0,0 +1,64 @@
+"""Bytes and CPU per /details request with identity, gzip and brotli responses.
+
+Serves every detail record in the stub fixtures, as fields=all, from a
+warm response cache and reports the body size and CPU time per request for each coding,
+plus the one-off cost of compressing a payload (paid on its first hit and
+then reused). Brotli is measured only if the brotli package is installed.
+Every payload is compressed, whatever its size (COMPRESS_MIN_BYTES=0
+unless set), so the fixtures' sizes do not switch the measurement off.
+
+    python benchmarks/compression.py [--requests 2000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('COMPRESS_MIN_BYTES', '0')
+
+import app as app_module  # noqa: E402
+import compression  # noqa: E402
+import stub_tmdb  # noqa: E402
+from cache import payload_bytes  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    server = stub_tmdb.start_in_thread()
+    app_module.TMDB_BASE_URL = server.base_url
+    client = app_module.app.test_client()
+    paths = [f'/details/{tmdb_id}?media_type={media_type}&fields=all'
+             for media_type, tmdb_id in stub_tmdb.Catalogue().details]
+    payloads = [payload_bytes(client.get(path).get_json()) for path in paths]
+    print(f"{len(paths)} detail records, {sum(map(len, payloads)) / len(payloads):.0f} B mean JSON payload, "
+          f"compressed from {compression.MIN_BYTES} B")
+
+    for encoding in (None,) + compression.ENCODINGS:
+        headers = {'Accept-Encoding': encoding} if encoding else {}
+        start = time.process_time()
+        sizes = [len(client.get(path, headers=headers).data) for path in paths]
+        first = (time.process_time() - start) / len(paths)
+        rounds = max(1, args.requests // len(paths))
+        start = time.process_time()
+        for _ in range(rounds):
+            for path in paths:
+                client.get(path, headers=headers)
+        cpu = (time.process_time() - start) / (rounds * len(paths))
+        print(f"{encoding or 'identity':<9} {sum(sizes) / len(sizes):7.0f} B/response   "
+              f"{cpu * 1e6:6.1f} us CPU/request   first hit {first * 1e6:6.1f} us")
+
+    for encoding in compression.ENCODINGS:
+        start = time.process_time()
+        for payload in payloads * 20:
+            compression.compress(payload, encoding)
+        cost = (time.process_time() - start) / (len(payloads) * 20)
+        print(f"compressing one payload with {encoding}: {cost * 1e6:.1f} us, saved by the cached copy on every hit")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
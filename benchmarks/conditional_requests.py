@@ -0,0 +1,45 @@
+"""Cost of a cached /details, /search and /autocomplete response: full 200 vs 304 revalidation.
+
+Warms the response cache from the stub TMDB server, then replays each
+request with and without the ETag it returned.
+
+    python benchmarks/conditional_requests.py [--requests 5000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module  # noqa: E402
+import stub_tmdb  # noqa: E402
+
+
+def timed(client, path, headers, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        response = client.get(path, headers=headers)
+    return (time.perf_counter() - start) / count, response
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=5000)
+    args = parser.parse_args()
+
+    server = stub_tmdb.start_in_thread()
+    app_module.TMDB_BASE_URL = server.base_url
+    client = app_module.app.test_client()
+    for path in ('/details/1399?media_type=tv', '/search?query=game%20of%20thrones', '/autocomplete?query=brea'):
+        validator = client.get(path).headers['ETag']
+        full, response = timed(client, path, {}, args.requests)
+        revalidated, not_modified = timed(client, path, {'If-None-Match': validator}, args.requests)
+        assert not_modified.status_code == 304
+        print(f"{path:<36} 200 {full * 1e6:6.1f} us ({len(response.data):5d} B)   "
+              f"304 {revalidated * 1e6:6.1f} us (0 B)")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Fetching every fixture title's details: one /details call each vs a single /details/batch.
+
+Runs against the stub TMDB server with fixed per-call latency, cold (empty
+response cache) and warm, and reports wall time and upstream calls for
+each approach. The batch's upstream concurrency is DETAILS_BATCH_CONCURRENCY.
+
+    python benchmarks/details_batch.py [--latency-ms 50] [--rounds 5]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module  # noqa: E402
+import stub_tmdb  # noqa: E402
+from cache import response_cache  # noqa: E402
+
+
+def one_by_one(client, pairs):
+    for media_type, tmdb_id in pairs:
+        assert client.get(f'/details/{tmdb_id}?media_type={media_type}').status_code == 200
+
+
+def batched(client, pairs):
+    items = [{'media_type': media_type, 'id': tmdb_id} for media_type, tmdb_id in pairs]
+    results = client.post('/details/batch', json={'items': items}).get_json()['results']
+    assert all(result['status'] == 200 for result in results)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--latency-ms', type=float, default=50)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    server = stub_tmdb.start_in_thread(latency=f'fixed:{args.latency_ms}')
+    app_module.TMDB_BASE_URL = server.base_url
+    client = app_module.app.test_client()
+    pairs = list(stub_tmdb.Catalogue().details)
+    print(f"{len(pairs)} titles, stub latency {args.latency_ms:.0f} ms, "
+          f"batch concurrency {app_module.DETAILS_BATCH_CONCURRENCY}")
+
+    for label, fetch in (('one by one', one_by_one), ('batch', batched)):
+        for state in ('cold', 'warm'):
+            seconds, calls = [], 0
+            for _ in range(args.rounds):
+                if state == 'cold':
+                    response_cache.clear()
+                before = server.request_count
+                start = time.perf_counter()
+                fetch(client, pairs)
+                seconds.append(time.perf_counter() - start)
+                calls += server.request_count - before
+            print(f"{label:<11} {state}  {statistics.median(seconds) * 1000:7.1f} ms   "
+                  f"{calls / args.rounds:5.1f} upstream calls")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
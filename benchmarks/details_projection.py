@@ -0,0 +1,70 @@
+"""Payload size, serialization time and cache memory of /details: raw TMDB documents vs projections.
+
+Takes every detail record in the stub fixtures and compares the raw
+document (what the cache held before projection) with the trimmed cached
+form, the default response profile and `fields=all`. Then serves the
+default profile from a warm cache to time a whole request.
+
+    python benchmarks/details_projection.py [--rounds 2000]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module  # noqa: E402
+import projection  # noqa: E402
+import stub_tmdb  # noqa: E402
+from cache import payload_bytes, response_cache  # noqa: E402
+
+
+def serialize_seconds(documents, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for document in documents:
+            json.dumps(document)
+    return (time.perf_counter() - start) / (rounds * len(documents))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rounds', type=int, default=2000)
+    args = parser.parse_args()
+
+    catalogue = stub_tmdb.Catalogue()
+    raw = list(catalogue.details.values())
+    trimmed = [projection.trim(document, media_type) for (media_type, _), document in catalogue.details.items()]
+    profiles = [
+        ('raw TMDB', raw),
+        ('fields=all', trimmed),
+        ('default', [projection.select(document, projection.DEFAULT_FIELDS) for document in trimmed]),
+    ]
+    print(f"{len(raw)} detail records")
+    for label, documents in profiles:
+        size = sum(len(payload_bytes(document)) for document in documents) / len(documents)
+        seconds = serialize_seconds(documents, args.rounds)
+        print(f"{label:<11} {size:7.0f} B/document   {seconds * 1e6:6.1f} us to serialize")
+
+    server = stub_tmdb.start_in_thread()
+    app_module.TMDB_BASE_URL = server.base_url
+    client = app_module.app.test_client()
+    paths = [f'/details/{tmdb_id}?media_type={media_type}' for media_type, tmdb_id in catalogue.details]
+    for path in paths:
+        client.get(path)
+    raw_bytes = sum(len(payload_bytes(document)) for document in raw)
+    print(f"cache: {response_cache.stats()['details']['bytes']} B for {len(paths)} projected entries "
+          f"(raw documents: {raw_bytes} B)")
+    rounds = max(1, args.rounds // 4)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for path in paths:
+            client.get(path)
+    print(f"cached default /details: {(time.perf_counter() - start) / (rounds * len(paths)) * 1e6:.1f} us/request")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
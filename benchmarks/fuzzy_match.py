@@ -0,0 +1,91 @@
+"""Build the typo-tolerant title index over synthetic titles and time lookups.
+
+Reports the worker's resident-set growth while building next to the
+index's own memory_bytes() estimate, which also counts the title strings
+the benchmark already holds. Titles past --max-bytes are not indexed.
+
+    python benchmarks/fuzzy_match.py [--titles 400000] [--queries 2000] [--max-bytes 67108864]
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fuzzy  # noqa: E402
+from fuzzy import TitleMatcher  # noqa: E402
+
+WORDS = ('the dark night last kingdom lost city return ring secret house dragon star war love story '
+         'yüzük kayıp şehir dönüş gece ölüm aşk savaş ejder kral kraliçe orman deniz yıldız zaman '
+         'black mirror crown game thrones matrix stranger things shadow empire island river').split()
+
+
+def synthetic_titles(count, rng):
+    seen = set()
+    while len(seen) < count:
+        title = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(2, 4)))
+        # A short random tail keeps titles distinct, like real catalogue noise
+        title += ' ' + ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(2, 5)))
+        seen.add(title)
+    return list(seen)
+
+
+def resident_bytes():
+    # Current resident set size on Linux; 0 elsewhere
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        return 0
+
+
+def typo(title, rng):
+    position = rng.randrange(len(title))
+    kind = rng.choice(('drop', 'swap', 'replace'))
+    if kind == 'drop':
+        return title[:position] + title[position + 1:]
+    if kind == 'swap' and position < len(title) - 1:
+        return title[:position] + title[position + 1] + title[position] + title[position + 2:]
+    return title[:position] + rng.choice(string.ascii_lowercase) + title[position + 1:]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--titles', type=int, default=400000)
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--max-bytes', type=int, default=fuzzy.MAX_BYTES)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    titles = synthetic_titles(args.titles, rng)
+
+    rss_before = resident_bytes()
+    start = time.perf_counter()
+    matcher = TitleMatcher(max_bytes=args.max_bytes)
+    matcher.add_many((title, rng.random() * 100) for title in titles)
+    build_seconds = time.perf_counter() - start
+    rss_growth = resident_bytes() - rss_before
+
+    targets = rng.sample(titles[:len(matcher)], min(args.queries, len(matcher)))
+    queries = [typo(title, rng) for title in targets]
+    found = correct = 0
+    start = time.perf_counter()
+    for target, query in zip(targets, queries):
+        match = matcher.match(query)
+        if match:
+            found += 1
+            correct += match[0] == target
+    query_seconds = time.perf_counter() - start
+
+    print(f"titles:      {len(matcher):,} indexed of {len(titles):,} (budget {args.max_bytes / 2**20:.0f} MiB)")
+    print(f"build:       {build_seconds:.1f}s")
+    print(f"memory:      RSS +{rss_growth / 2**20:.0f} MiB, memory_bytes() {matcher.memory_bytes() / 2**20:.0f} MiB")
+    print(f"lookups:     {len(queries) / query_seconds:,.0f}/s ({query_seconds / len(queries) * 1e3:.2f} ms each)")
+    print(f"typo hits:   {found / len(queries):.1%} matched, {correct / len(queries):.1%} to the intended title")
+
+
+if __name__ == '__main__':
+    main()
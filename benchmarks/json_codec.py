@@ -0,0 +1,67 @@
+"""Encode and decode cost of the stdlib vs orjson JSON codecs on TMDB detail payloads.
+
+Uses every detail record in the stub fixtures: decoding the raw upstream
+body, and encoding the raw document, the cached fields=all projection and
+the default /details profile through each Flask JSON provider (what
+jsonify() does). orjson rows are skipped if it is not installed.
+
+    python benchmarks/json_codec.py [--rounds 2000]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+
+import json_codec  # noqa: E402
+import projection  # noqa: E402
+import stub_tmdb  # noqa: E402
+
+
+def per_item(function, items, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for item in items:
+            function(item)
+    return (time.perf_counter() - start) / (rounds * len(items))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rounds', type=int, default=2000)
+    args = parser.parse_args()
+
+    catalogue = stub_tmdb.Catalogue()
+    raw = list(catalogue.details.values())
+    trimmed = [projection.trim(document, media_type) for (media_type, _), document in catalogue.details.items()]
+    payloads = [
+        ('raw document', raw),
+        ('fields=all', trimmed),
+        ('default', [projection.select(document, projection.DEFAULT_FIELDS) for document in trimmed]),
+    ]
+    bodies = [json.dumps(document, ensure_ascii=False).encode('utf-8') for document in raw]
+
+    providers = [('stdlib', DefaultJSONProvider)]
+    if json_codec.orjson is not None:
+        providers.append(('orjson', json_codec.OrjsonProvider))
+    else:
+        print('orjson is not installed; measuring the stdlib codec only')
+
+    print(f"{len(raw)} detail records, {sum(map(len, bodies)) / len(bodies):.0f} B mean upstream body")
+    decoders = {'stdlib': json.loads, 'orjson': getattr(json_codec.orjson, 'loads', None)}
+    app = Flask(__name__)
+    for name, provider_class in providers:
+        provider = provider_class(app)
+        decode = per_item(decoders[name], bodies, args.rounds)
+        encodes = [per_item(provider.response, documents, args.rounds) for _, documents in payloads]
+        print(f"{name:<7} decode upstream {decode * 1e6:5.1f} us   jsonify "
+              + '   '.join(f"{label} {seconds * 1e6:5.1f} us" for (label, _), seconds in zip(payloads, encodes)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,215 @@
+"""End-to-end load test for /search, /autocomplete and /details.
+
+Drives the Flask app in-process against the local stub TMDB server
+(stub_tmdb.py) with a seeded, repeatable workload of user sessions. Each
+session picks a title from a Zipf distribution over the stub's catalogue,
+types it keystroke by keystroke into /autocomplete, submits /search and
+sometimes clicks through to /details. Reports throughput, p50/p95/p99
+latency and upstream TMDB calls per request, per endpoint, and writes the
+results as JSON so runs can be diffed between commits:
+
+    python benchmarks/load_suite.py [--sessions 300] [--threads 8] [--latency lognormal:3.9:0.4]
+    python benchmarks/load_suite.py --compare bench_results/OLD.json bench_results/NEW.json
+
+Latency is measured through the Flask test client, so it includes routing
+and JSON encoding but not a WSGI server or the network between it and the
+browser.
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from bisect import bisect
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import accumulate
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import app as app_module  # noqa: E402
+import genres  # noqa: E402
+import stub_tmdb  # noqa: E402
+import tmdb_client  # noqa: E402
+from cache import response_cache  # noqa: E402
+
+ENDPOINTS = ('autocomplete', 'search', 'details')
+
+
+def catalogue_titles(fixtures_dir):
+    # Most popular first, so Zipf rank 1 is the title users ask for most
+    catalogue = stub_tmdb.Catalogue(fixtures_dir)
+    return [
+        (hit['media_type'], hit['id'], hit.get('title') or hit.get('name'),
+         hit.get('original_title') or hit.get('original_name'))
+        for hit in catalogue.hits
+    ]
+
+
+def build_sessions(titles, count, zipf_s, click_rate, original_rate, seed):
+    rng = random.Random(seed)
+    cumulative = list(accumulate(1 / rank ** zipf_s for rank in range(1, len(titles) + 1)))
+    sessions = []
+    for _ in range(count):
+        media_type, tmdb_id, title, original = titles[bisect(cumulative, rng.random() * cumulative[-1])]
+        query = original if original and rng.random() < original_rate else title
+        # Users stop typing once the suggestion they want shows up
+        typed = rng.randint(min(3, len(query)), min(len(query), 10))
+        steps = [('autocomplete', 'GET', f'/autocomplete?query={query[:length]}', None)
+                 for length in range(1, typed + 1)]
+        steps.append(('search', 'POST', '/search', {'query': query}))
+        if rng.random() < click_rate:
+            steps.append(('details', 'GET', f'/details/{tmdb_id}?media_type={media_type}', None))
+        sessions.append(steps)
+    return sessions
+
+
+def run(client, sessions, threads):
+    samples = defaultdict(list)
+    statuses = defaultdict(lambda: defaultdict(int))
+    lock = threading.Lock()
+
+    def play(steps):
+        for endpoint, method, path, body in steps:
+            start = time.perf_counter()
+            response = client.open(path, method=method, json=body)
+            elapsed = time.perf_counter() - start
+            # The test client serves the request on this thread, so the
+            # thread-local upstream counters belong to this request
+            calls, _ = tmdb_client.current_timing()
+            with lock:
+                samples[endpoint].append((elapsed, calls))
+                statuses[endpoint][response.status_code] += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(play, sessions))
+    return samples, statuses, time.perf_counter() - start
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summarize(samples, statuses, wall_seconds):
+    endpoints = {}
+    for endpoint in ENDPOINTS:
+        rows = samples.get(endpoint)
+        if not rows:
+            continue
+        latencies = sorted(elapsed for elapsed, _ in rows)
+        upstream = sum(calls for _, calls in rows)
+        endpoints[endpoint] = {
+            'requests': len(rows),
+            'p50_ms': round(percentile(latencies, 0.50) * 1e3, 2),
+            'p95_ms': round(percentile(latencies, 0.95) * 1e3, 2),
+            'p99_ms': round(percentile(latencies, 0.99) * 1e3, 2),
+            'mean_ms': round(sum(latencies) / len(latencies) * 1e3, 2),
+            'upstream_calls': upstream,
+            'upstream_calls_per_request': round(upstream / len(rows), 3),
+            'status': {str(code): count for code, count in sorted(statuses[endpoint].items())},
+        }
+    total = sum(row['requests'] for row in endpoints.values())
+    upstream = sum(row['upstream_calls'] for row in endpoints.values())
+    return {
+        'requests': total,
+        'wall_seconds': round(wall_seconds, 3),
+        'throughput_rps': round(total / wall_seconds, 1),
+        'upstream_calls': upstream,
+        'upstream_calls_per_request': round(upstream / total, 3) if total else 0.0,
+        'endpoints': endpoints,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def print_summary(summary):
+    print(f"{summary['requests']} requests in {summary['wall_seconds']:.2f} s, "
+          f"{summary['throughput_rps']:.0f} req/s, {summary['upstream_calls_per_request']:.3f} upstream calls/request")
+    for endpoint, row in summary['endpoints'].items():
+        print(f"{endpoint:<13} n={row['requests']:<6} p50 {row['p50_ms']:7.2f} ms  p95 {row['p95_ms']:7.2f} ms  "
+              f"p99 {row['p99_ms']:7.2f} ms  upstream/req {row['upstream_calls_per_request']:.3f}  {row['status']}")
+
+
+def compare(old_path, new_path):
+    with open(old_path, encoding='utf-8') as old_file, open(new_path, encoding='utf-8') as new_file:
+        old, new = json.load(old_file), json.load(new_file)
+    print(f"{old['revision']} -> {new['revision']}")
+    if old['config'] != new['config']:
+        print('warning: runs used different settings')
+    metrics = ('throughput_rps', 'p50_ms', 'p95_ms', 'p99_ms', 'upstream_calls_per_request')
+    for endpoint in ('all',) + ENDPOINTS:
+        before = old['summary'] if endpoint == 'all' else old['summary']['endpoints'].get(endpoint)
+        after = new['summary'] if endpoint == 'all' else new['summary']['endpoints'].get(endpoint)
+        if not before or not after:
+            continue
+        for metric in metrics:
+            if metric in before and metric in after:
+                change = (after[metric] - before[metric]) / before[metric] * 100 if before[metric] else 0.0
+                print(f"{endpoint:<13} {metric:<27} {before[metric]:>10} -> {after[metric]:>10}  {change:+6.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', type=int, default=300)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--latency', default='lognormal:3.9:0.4', help='stub latency, see stub_tmdb.parse_latency')
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--zipf', type=float, default=1.1, help='Zipf exponent over title popularity')
+    parser.add_argument('--click-rate', type=float, default=0.4, help='share of searches followed by /details')
+    parser.add_argument('--original-rate', type=float, default=0.3, help='share of queries using the original title')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--fixtures', default=stub_tmdb.FIXTURES_DIR)
+    parser.add_argument('--output', help='JSON results path (default bench_results/load_<revision>.json)')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='diff two saved result files and exit')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    server = stub_tmdb.start_in_thread(fixtures_dir=args.fixtures, latency=args.latency,
+                                       error_rate=args.error_rate, seed=args.seed)
+    app_module.TMDB_BASE_URL = server.base_url
+    response_cache.clear()
+    genres._tables.clear()
+    genres._loaded_at.clear()
+    genres._retry_at.clear()
+
+    sessions = build_sessions(catalogue_titles(args.fixtures), args.sessions, args.zipf,
+                              args.click_rate, args.original_rate, args.seed)
+    samples, statuses, wall_seconds = run(app_module.app.test_client(), sessions, args.threads)
+    server.shutdown()
+
+    summary = summarize(samples, statuses, wall_seconds)
+    summary['stub_requests'] = server.request_count
+    print_summary(summary)
+
+    revision = git_revision()
+    config = {key: value for key, value in vars(args).items() if key not in ('output', 'compare', 'fixtures')}
+    output = args.output or os.path.join(ROOT, 'bench_results', f'load_{revision}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as results:
+        json.dump({
+            'revision': revision,
+            'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'python': sys.version.split()[0],
+            'config': config,
+            'summary': summary,
+        }, results, indent=2)
+        results.write('\n')
+    print(f'Saved {output}')
+
+
+if __name__ == '__main__':
+    main()
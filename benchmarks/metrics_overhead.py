@@ -0,0 +1,73 @@
+"""Cost of the /metrics instrumentation relative to request time.
+
+Times the per-request recording calls on their own, then serves a cached
+/details hit (the cheapest request the app handles, so the worst case for
+relative overhead) with the instrumentation hooks installed and removed.
+
+    python benchmarks/metrics_overhead.py [--requests 20000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+
+import app as app_module  # noqa: E402
+import metrics  # noqa: E402
+import stub_tmdb  # noqa: E402
+
+
+def per_request_recording(count):
+    start = time.perf_counter()
+    for _ in range(count):
+        metrics.observe_request('/details/<id>', 'GET', 200, 0.0002, 1200)
+        metrics.SERIALIZE_SECONDS.observe((), 0.00002)
+    return (time.perf_counter() - start) / count
+
+
+def serve(client, path, count):
+    for _ in range(200):
+        client.get(path)
+    start = time.perf_counter()
+    for _ in range(count):
+        client.get(path)
+    return (time.perf_counter() - start) / count
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=20000)
+    args = parser.parse_args()
+
+    server = stub_tmdb.start_in_thread()
+    app_module.TMDB_BASE_URL = server.base_url
+    app = app_module.app
+    client = app.test_client()
+    path = '/details/27205?media_type=movie'
+    assert client.get(path).status_code == 200
+
+    recording = per_request_recording(args.requests)
+    hooks = app.after_request_funcs[None]
+    timed_json = app.json
+    bare, instrumented = [], []
+    # Alternate rounds so drift in machine speed hits both sides equally
+    for _ in range(3):
+        hooks.remove(app_module.record_request_metrics)
+        app.json = DefaultJSONProvider(app)
+        bare.append(serve(client, path, args.requests))
+        hooks.append(app_module.record_request_metrics)
+        app.json = timed_json
+        instrumented.append(serve(client, path, args.requests))
+    bare, instrumented = min(bare), min(instrumented)
+    server.shutdown()
+
+    print(f"recording calls      {recording * 1e6:6.2f} us/request")
+    print(f"cached /details      {bare * 1e6:6.1f} us bare, {instrumented * 1e6:6.1f} us instrumented")
+    print(f"hook overhead        {(instrumented - bare) / bare * 100:5.2f}% of the cheapest request")
+
+
+if __name__ == '__main__':
+    main()
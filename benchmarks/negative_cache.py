@@ -0,0 +1,82 @@
+"""Negative cache: upstream calls saved on repeated no-match queries, and filter memory/accuracy.
+
+First replays a bot-like stream of no-match /search and /autocomplete
+queries (each distinct query repeated several times) against the stub TMDB
+server, with empty results kept in the negative filter and, for
+comparison, as ordinary LRU entries. Then fills a rotating Bloom filter with
+millions of distinct keys and measures its memory and observed
+false-positive rate on keys that were never added.
+
+    python benchmarks/negative_cache.py [--distinct 300] [--repeats 5] [--keys 2000000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module  # noqa: E402
+import cache  # noqa: E402
+import stub_tmdb  # noqa: E402
+from bloom import RotatingBloomFilter  # noqa: E402
+from cache import response_cache  # noqa: E402
+
+
+def replay(client, server, distinct, repeats, seed):
+    rng = random.Random(seed)
+    queries = [''.join(rng.choice('bcdfghjklmnpqrstvwxz') for _ in range(8)) for _ in range(distinct)]
+    stream = [query for query in queries for _ in range(repeats)]
+    rng.shuffle(stream)
+    before = server.request_count
+    for query in stream:
+        assert client.post('/search', json={'query': query}).status_code == 404
+        client.get(f'/autocomplete?query={query}')
+    return len(stream) * 2, server.request_count - before
+
+
+def fill(keys, capacity, error_rate):
+    negatives = RotatingBloomFilter(capacity, error_rate, ttl=3600)
+    start = time.perf_counter()
+    for number in range(keys):
+        negatives.add(f'miss-{number}\x1ftr-TR'.encode())
+    add_seconds = (time.perf_counter() - start) / keys
+    probes = 200000
+    start = time.perf_counter()
+    false_positives = sum(f'never-{number}\x1ftr-TR'.encode() in negatives for number in range(probes))
+    lookup_seconds = (time.perf_counter() - start) / probes
+    return negatives.stats(), false_positives / probes, add_seconds, lookup_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--distinct', type=int, default=300)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--keys', type=int, default=2000000)
+    parser.add_argument('--seed', type=int, default=3)
+    args = parser.parse_args()
+
+    server = stub_tmdb.start_in_thread()
+    app_module.TMDB_BASE_URL = server.base_url
+    client = app_module.app.test_client()
+    for enabled in (False, True):
+        for region in response_cache.regions.values():
+            region.policy.negative_ttl = 600 if enabled else 0
+        response_cache.clear()
+        requests, upstream = replay(client, server, args.distinct, args.repeats, args.seed)
+        entries = sum(stats['entries'] for stats in response_cache.stats().values())
+        label = 'Bloom filter' if enabled else 'LRU entries'
+        print(f"{label:<13} {requests} no-match requests -> {upstream} upstream calls, {entries} LRU entries")
+    server.shutdown()
+
+    capacity = cache.POLICIES['search'].negative_capacity
+    stats, observed, add_seconds, lookup_seconds = fill(args.keys, capacity, cache.NEGATIVE_ERROR_RATE)
+    print(f"{args.keys} distinct misses, capacity {capacity}/generation: {stats['bytes'] / 2**20:.2f} MiB, "
+          f"{stats['rotations']} rotations")
+    print(f"false positives: expected {stats['false_positive_rate']:.2e}, observed {observed:.2e}; "
+          f"add {add_seconds * 1e6:.2f} us, lookup {lookup_seconds * 1e6:.2f} us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""Measure fold() throughput on synthetic titles built from the test corpus.
+
+    python benchmarks/normalize_throughput.py [--titles 200000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from normalize import fold  # noqa: E402
+from tests.test_normalize import CORPUS  # noqa: E402
+
+
+def synthetic_titles(count, seed=7):
+    rng = random.Random(seed)
+    words = [text for text, _ in CORPUS if text.strip()] + ['Yüzüklerin', 'Efendisi', 'Kayıp', 'Şehir', 'Dönüş']
+    return [' '.join(rng.choice(words) for _ in range(rng.randint(1, 4))) + f' {i}' for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--titles', type=int, default=200000)
+    args = parser.parse_args()
+
+    titles = synthetic_titles(args.titles)
+    raw = fold.__wrapped__
+    start = time.perf_counter()
+    for title in titles:
+        raw(title)
+    uncached = time.perf_counter() - start
+
+    fold.cache_clear()
+    for title in titles[:1000]:
+        fold(title)
+    hot = titles[:1000] * (args.titles // 1000)
+    start = time.perf_counter()
+    for title in hot:
+        fold(title)
+    cached = time.perf_counter() - start
+
+    print(f"uncached: {len(titles) / uncached:,.0f} titles/s ({uncached / len(titles) * 1e6:.2f} us/title)")
+    print(f"cached:   {len(hot) / cached:,.0f} titles/s ({cached / len(hot) * 1e6:.2f} us/title)")
+
+
+if __name__ == '__main__':
+    main()
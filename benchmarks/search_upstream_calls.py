@@ -0,0 +1,97 @@
+"""Compare upstream TMDB calls per /search before and after genre-table resolution.
+
+Runs fully offline: a requests transport adapter answers TMDB URLs with canned
+payloads and counts every call that would have gone over the network.
+
+    python benchmarks/search_upstream_calls.py [--queries 500]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import requests
+from requests.adapters import BaseAdapter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module  # noqa: E402
+import tmdb_client  # noqa: E402
+
+GENRES = [{'id': 28, 'name': 'Aksiyon'}, {'id': 18, 'name': 'Dram'}, {'id': 10765, 'name': 'Bilim Kurgu & Fantazi'}]
+
+
+class CountingAdapter(BaseAdapter):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def send(self, request, **kwargs):
+        self.calls += 1
+        path = request.path_url.split('?')[0]
+        if path.endswith('/search/multi'):
+            # Alternate movie and tv hits, like real traffic
+            media_type = 'movie' if self.calls % 2 else 'tv'
+            body = {'results': [{'id': self.calls, 'media_type': media_type, 'title': 'Film', 'name': 'Dizi',
+                                 'overview': 'Bir. Iki. Uc. Dort.', 'genre_ids': [28, 18]}]}
+        elif '/genre/' in path:
+            body = {'genres': GENRES}
+        else:
+            body = {'id': 1, 'genres': GENRES[:2], 'tagline': 'Tagline', 'name': 'Dizi'}
+        response = requests.Response()
+        response.status_code = 200
+        response.url = request.url
+        response._content = json.dumps(body).encode()
+        return response
+
+    def close(self):
+        pass
+
+
+def legacy_search(query):
+    # The pre-genre-table path: /search/multi followed by a serial detail GET
+    base, key = app_module.TMDB_BASE_URL, app_module.TMDB_API_KEY
+    response = tmdb_client.get(f"{base}/search/multi", params={'api_key': key, 'query': query, 'language': 'tr-TR'})
+    result = response.json()['results'][0]
+    detail = tmdb_client.get(f"{base}/{result['media_type']}/{result['id']}", params={'api_key': key, 'language': 'tr-TR'})
+    result['genres'] = [genre['name'] for genre in detail.json().get('genres', [])]
+    return result
+
+
+def run(label, search, adapter, queries):
+    adapter.calls = 0
+    start = time.perf_counter()
+    for i in range(queries):
+        search(f"query {i}")
+    elapsed = time.perf_counter() - start
+    return {
+        'path': label,
+        'queries': queries,
+        'upstream_calls': adapter.calls,
+        'calls_per_search': adapter.calls / queries,
+        'seconds': round(elapsed, 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--queries', type=int, default=500)
+    args = parser.parse_args()
+
+    adapter = CountingAdapter()
+    session = tmdb_client.get_session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    results = [
+        run('before (search + detail)', legacy_search, adapter, args.queries),
+        run('after (search + genre table)', app_module.search_external_api, adapter, args.queries),
+    ]
+    for row in results:
+        print(f"{row['path']:<32} calls={row['upstream_calls']:<6} per_search={row['calls_per_search']:.3f} "
+              f"time={row['seconds']}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""Time the sentence segmenter on overviews built from the test corpus.
+
+    python benchmarks/sentence_segmentation.py [--overviews 50000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sentences import first_sentences, first_sentences_batch, iter_sentences  # noqa: E402
+from tests.test_sentences import CORPUS  # noqa: E402
+
+
+def split_baseline(text, count):
+    # The previous implementation in generate_custom_description
+    return '.'.join(text.split('.')[:count]) + '.'
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--overviews', type=int, default=50000)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    pool = [text for text, _ in CORPUS if text]
+    overviews = [' '.join(rng.choice(pool) for _ in range(rng.randint(3, 12))) for _ in range(args.overviews)]
+
+    timings = {}
+    start = time.perf_counter()
+    for overview in overviews:
+        split_baseline(overview, 3)
+    timings['str.split baseline'] = time.perf_counter() - start
+    start = time.perf_counter()
+    for overview in overviews:
+        first_sentences(overview, 3)
+    timings['first_sentences'] = time.perf_counter() - start
+    start = time.perf_counter()
+    first_sentences_batch(overviews, 3)
+    timings['first_sentences_batch'] = time.perf_counter() - start
+    start = time.perf_counter()
+    for overview in overviews:
+        list(iter_sentences(overview))
+    timings['full segmentation'] = time.perf_counter() - start
+
+    for label, seconds in timings.items():
+        print(f"{label:<24} {len(overviews) / seconds:>12,.0f} overviews/s  {seconds / len(overviews) * 1e6:7.2f} us each")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Compare per-overview and batched spoiler scoring with a memory-mapped model.
+
+Trains a throwaway model on fixtures/spoiler_sentences.tsv, so it runs
+offline. Requires NumPy.
+
+    python benchmarks/spoiler_model_scoring.py [--overviews 20000] [--batch 500]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import spoiler_model  # noqa: E402
+from sentences import iter_sentences  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--overviews', type=int, default=20000)
+    parser.add_argument('--batch', type=int, default=500)
+    args = parser.parse_args()
+
+    if spoiler_model.np is None:
+        sys.exit('NumPy is not installed.')
+    np = spoiler_model.np
+
+    examples = list(spoiler_model.read_examples(os.path.join(ROOT, 'fixtures', 'spoiler_sentences.tsv')))
+    start = time.perf_counter()
+    weights = spoiler_model.train(examples)
+    print(f"train: {len(examples)} sentences in {time.perf_counter() - start:.2f}s")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'model.npy')
+        np.save(path, weights)
+        start = time.perf_counter()
+        model = spoiler_model.SpoilerModel.load(path)
+        print(f"load:  {(time.perf_counter() - start) * 1e3:.2f} ms (memory-mapped, {os.path.getsize(path) / 2**20:.1f} MiB)")
+
+        rng = random.Random(9)
+        sentences = [sentence for _, sentence in examples]
+        overviews = [list(iter_sentences(' '.join(rng.choice(sentences) for _ in range(rng.randint(3, 8)))))
+                     for _ in range(args.overviews)]
+        total = sum(len(overview) for overview in overviews)
+
+        start = time.perf_counter()
+        single = [model.keep_safe(overview, 0.5) for overview in overviews]
+        one_by_one = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batched = []
+        for offset in range(0, len(overviews), args.batch):
+            batched.extend(model.keep_safe_batch(overviews[offset:offset + args.batch], 0.5))
+        in_batches = time.perf_counter() - start
+
+        assert single == batched
+        for label, seconds in (('per overview', one_by_one), (f'batches of {args.batch}', in_batches)):
+            print(f"{label:<16} {len(overviews) / seconds:>10,.0f} overviews/s  {total / seconds:>10,.0f} sentences/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Measure spoiler scrubbing throughput as the lexicon grows past 10k terms.
+
+    python benchmarks/spoiler_scrubber.py [--patterns 10000 50000] [--overviews 5000]
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spoilers import SpoilerLexicon  # noqa: E402
+
+SENTENCES = [
+    'Dom Cobb, rüyalara girip sır çalan usta bir hırsızdır.',
+    'Ona son bir iş teklif edilir ve geçmişi peşini bırakmaz.',
+    'Ekibi derin bir rüya katmanına iner.',
+    'Kahramanımız finalde hayatını kaybeder.',
+    'Kasabada kaybolan bir çocuk aranırken garip olaylar yaşanır.',
+    'Meğer doktor başından beri onlara yalan söylüyormuş.',
+    'İki rakip aile taht için savaşa girer.',
+]
+
+
+def random_terms(count, rng):
+    letters = string.ascii_lowercase + 'çğıöşü'
+    return [''.join(rng.choice(letters) for _ in range(rng.randint(4, 12))) for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--patterns', type=int, nargs='+', default=[100, 10000, 50000])
+    parser.add_argument('--overviews', type=int, default=5000)
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    overviews = [' '.join(rng.choice(SENTENCES) for _ in range(rng.randint(3, 8))) for _ in range(args.overviews)]
+    characters = sum(len(overview) for overview in overviews)
+    items = [(overview, 'movie', i % 100) for i, overview in enumerate(overviews)]
+
+    for count in args.patterns:
+        terms = ['hayatını kaybeder', 'meğer'] + random_terms(count, rng)
+        start = time.perf_counter()
+        lexicon = SpoilerLexicon(terms)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        scrubbed = lexicon.scrub_batch(items)
+        elapsed = time.perf_counter() - start
+        dropped = sum(overview.count('.') - result.count('.') for overview, result in zip(overviews, scrubbed))
+        print(f"{count:>7} terms: build {build:6.2f}s, {len(lexicon.global_automaton):>8} states, "
+              f"{characters / elapsed / 1e6:5.2f} M chars/s, {len(overviews) / elapsed:8,.0f} overviews/s, "
+              f"{dropped} sentences dropped")
+
+
+if __name__ == '__main__':
+    main()
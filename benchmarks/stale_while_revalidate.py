@@ -0,0 +1,87 @@
+"""Latency and availability of /details around cache expiry, with and without stale serving.
+
+Every round lets each cached detail record expire, then requests it again:
+with stale-while-revalidate the expired record is returned at once and
+refreshed in the background, without it the request waits for TMDB. A
+final round runs against a stub that fails every call, to show
+stale-if-error keeping detail pages up.
+
+    python benchmarks/stale_while_revalidate.py [--latency-ms 80] [--rounds 5]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module  # noqa: E402
+import stub_tmdb  # noqa: E402
+from cache import response_cache  # noqa: E402
+
+TTL = 0.3
+
+
+def request_all(client, paths):
+    timings, failures = [], 0
+    for path in paths:
+        start = time.perf_counter()
+        response = client.get(path)
+        timings.append(time.perf_counter() - start)
+        failures += response.status_code != 200
+    return timings, failures
+
+
+def run(client, paths, rounds, stale):
+    policy = response_cache.regions['details'].policy
+    policy.ttl = TTL
+    policy.stale_while_revalidate = 60 if stale else 0
+    policy.stale_if_error = 600 if stale else 0
+    response_cache.clear()
+    request_all(client, paths)
+    timings = []
+    for _ in range(rounds):
+        time.sleep(TTL * 1.5)
+        timings += request_all(client, paths)[0]
+        # Let background refreshes land before the next expiry
+        time.sleep(0.2)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--latency-ms', type=float, default=80)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    server = stub_tmdb.start_in_thread(latency=f'fixed:{args.latency_ms}')
+    app_module.TMDB_BASE_URL = server.base_url
+    client = app_module.app.test_client()
+    paths = [f'/details/{tmdb_id}?media_type={media_type}'
+             for media_type, tmdb_id in stub_tmdb.Catalogue().details]
+
+    for stale in (False, True):
+        timings = sorted(run(client, paths, args.rounds, stale))
+        label = 'stale-while-revalidate' if stale else 'expire and refetch'
+        print(f"{label:<24} mean {statistics.mean(timings) * 1e3:6.1f} ms   "
+              f"max {timings[-1] * 1e3:6.1f} ms over {len(timings)} post-expiry requests")
+
+    outage = stub_tmdb.start_in_thread(latency=f'fixed:{args.latency_ms}', error_rate=1.0, error_status=503)
+    for stale in (False, True):
+        run(client, paths, 0, stale)
+        app_module.TMDB_BASE_URL = outage.base_url
+        # Push every record past its revalidate window, into stale-if-error
+        policy = response_cache.regions['details'].policy
+        policy.stale_while_revalidate = 0
+        time.sleep(TTL * 1.5)
+        failures = request_all(client, paths)[1]
+        app_module.TMDB_BASE_URL = server.base_url
+        label = 'stale-if-error' if stale else 'no stale serving'
+        print(f"{label:<24} {failures}/{len(paths)} detail requests failed during a TMDB outage")
+    server.shutdown()
+    outage.shutdown()
+
+
+if __name__ == '__main__':
+    main()
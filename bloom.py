@@ -0,0 +1,87 @@
+import hashlib
+import math
+import time
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over byte strings, sized for capacity items at error_rate."""
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.num_bits = max(64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+        self.bits_set = 0
+
+    def _positions(self, item):
+        # Kirsch-Mitzenmacher double hashing: k positions from one 128-bit digest
+        digest = hashlib.blake2b(item, digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        step = int.from_bytes(digest[8:], 'little') | 1
+        num_bits = self.num_bits
+        return [(first + i * step) % num_bits for i in range(self.num_hashes)]
+
+    def add(self, item):
+        bits = self.bits
+        for position in self._positions(item):
+            mask = 1 << (position & 7)
+            if not bits[position >> 3] & mask:
+                bits[position >> 3] |= mask
+                self.bits_set += 1
+        self.count += 1
+
+    def __contains__(self, item):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def false_positive_rate(self):
+        # Chance that k random positions are all set, from the actual fill
+        return (self.bits_set / self.num_bits) ** self.num_hashes
+
+
+class RotatingBloomFilter:
+    """Two Bloom filter generations that forget items after ttl to 2*ttl seconds.
+
+    Lookups check both generations. Every ttl seconds, or sooner once the
+    current generation holds capacity items, the older one is dropped and
+    a new empty one started, so memory stays at two filters however many
+    distinct items are added.
+    """
+
+    def __init__(self, capacity, error_rate, ttl, clock=time.monotonic):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.ttl = ttl
+        self.clock = clock
+        self.current = BloomFilter(capacity, error_rate)
+        self.previous = BloomFilter(capacity, error_rate)
+        self.rotated_at = clock()
+        self.rotations = 0
+
+    def _maybe_rotate(self):
+        now = self.clock()
+        if now - self.rotated_at >= self.ttl or self.current.count >= self.capacity:
+            if now - self.rotated_at >= 2 * self.ttl:
+                # Idle for a whole extra period: both generations are out of date
+                self.current = BloomFilter(self.capacity, self.error_rate)
+            self.previous = self.current
+            self.current = BloomFilter(self.capacity, self.error_rate)
+            self.rotated_at = now
+            self.rotations += 1
+
+    def add(self, item):
+        self._maybe_rotate()
+        self.current.add(item)
+
+    def __contains__(self, item):
+        self._maybe_rotate()
+        return item in self.current or item in self.previous
+
+    def stats(self):
+        return {
+            'entries': self.current.count + self.previous.count,
+            'bytes': len(self.current.bits) + len(self.previous.bits),
+            'false_positive_rate': 1 - (1 - self.current.false_positive_rate()) * (1 - self.previous.false_positive_rate()),
+            'rotations': self.rotations,
+        }
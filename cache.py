@@ -0,0 +1,464 @@
+import asyncio
+import functools
+import hashlib
+import logging
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import compression
+import json_codec
+from bloom import RotatingBloomFilter
+from normalize import fold
+from singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+LANGUAGE = 'tr-TR'
+
+MISSING = object()
+
+# Lookup states. An expired entry is still served for stale_while_revalidate
+# seconds while a background refresh runs, and for stale_if_error seconds
+# (counted from expiry too) whenever the upstream refresh fails.
+FRESH = 'fresh'
+REVALIDATE = 'revalidate'
+IF_ERROR = 'if_error'
+# A recent upstream answer for this key had no results
+NEGATIVE = 'negative'
+
+REFRESH_WORKERS = int(os.environ.get('CACHE_REFRESH_WORKERS', '2'))
+# No-result keys live in a rotating Bloom filter rather than the LRU, so a
+# flood of distinct misses costs a fixed amount of memory. A false positive
+# turns a real query into "no results" until the key ages out, so the error
+# rate is kept low and a share of negative hits is re-checked upstream.
+NEGATIVE_ERROR_RATE = float(os.environ.get('CACHE_NEGATIVE_ERROR_RATE', '0.0001'))
+NEGATIVE_VERIFY_RATE = float(os.environ.get('CACHE_NEGATIVE_VERIFY_RATE', '0.01'))
+
+
+class Policy:
+    def __init__(self, ttl, max_entries, max_bytes, stale_while_revalidate=0, stale_if_error=0,
+                 negative_ttl=0, negative_capacity=0):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stale_while_revalidate = stale_while_revalidate
+        self.stale_if_error = stale_if_error
+        self.negative_ttl = negative_ttl
+        self.negative_capacity = negative_capacity
+
+
+def _policy_from_env(endpoint, ttl, max_entries, max_bytes, stale_while_revalidate=0, stale_if_error=0,
+                     negative_ttl=0, negative_capacity=0):
+    prefix = f'CACHE_{endpoint.upper()}_'
+    return Policy(
+        ttl=float(os.environ.get(prefix + 'TTL', ttl)),
+        max_entries=int(os.environ.get(prefix + 'MAX_ENTRIES', max_entries)),
+        max_bytes=int(os.environ.get(prefix + 'MAX_BYTES', max_bytes)),
+        stale_while_revalidate=float(os.environ.get(prefix + 'STALE_WHILE_REVALIDATE', stale_while_revalidate)),
+        stale_if_error=float(os.environ.get(prefix + 'STALE_IF_ERROR', stale_if_error)),
+        negative_ttl=float(os.environ.get(prefix + 'NEGATIVE_TTL', negative_ttl)),
+        negative_capacity=int(os.environ.get(prefix + 'NEGATIVE_CAPACITY', negative_capacity)),
+    )
+
+
+# Details change rarely and are clicked repeatedly, so an expired record is
+# served for up to a day while it refreshes, and for a week during an outage.
+# Autocomplete results for a prefix go stale quickly and there are many of
+# them. Searches and prefixes with no results are remembered for a few
+# minutes, up to 500k per filter generation (about 1.2 MB each).
+POLICIES = {
+    'search': _policy_from_env('search', 60 * 60, 5000, 16 * 1024 * 1024,
+                               negative_ttl=10 * 60, negative_capacity=500000),
+    'autocomplete': _policy_from_env('autocomplete', 5 * 60, 20000, 8 * 1024 * 1024,
+                                     negative_ttl=5 * 60, negative_capacity=500000),
+    'details': _policy_from_env('details', 24 * 60 * 60, 5000, 32 * 1024 * 1024,
+                                stale_while_revalidate=24 * 60 * 60, stale_if_error=7 * 24 * 60 * 60),
+}
+
+
+def payload_bytes(value):
+    return json_codec.dumps(value)
+
+
+def digest(data):
+    # Stable across processes, unlike hash(), so every worker agrees on ETags
+    return hashlib.blake2b(data, digest_size=12).hexdigest()
+
+
+class Entry:
+    __slots__ = ('value', 'size', 'expires_at', 'etag', 'encoded')
+
+    def __init__(self, value, size, expires_at, etag=None):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+        self.etag = etag
+        # Content coding -> compressed payload bytes, filled on first use
+        self.encoded = {}
+
+
+class Region:
+    """LRU of entries for one endpoint, bounded by entry count and bytes."""
+
+    def __init__(self, policy, clock=time.monotonic):
+        self.policy = policy
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.second_tier_hits = 0
+        self.stale_hits = 0
+        self.stale_if_error_hits = 0
+        self.refreshes = 0
+        self.negative_hits = 0
+        self.negative_checks = 0
+        self.negative_false_positives = 0
+        # Keys live between negative_ttl / 2 and negative_ttl
+        self.negatives = None
+        if policy.negative_ttl > 0 and policy.negative_capacity > 0:
+            self.negatives = RotatingBloomFilter(policy.negative_capacity, NEGATIVE_ERROR_RATE, policy.negative_ttl / 2,
+                                                 clock)
+
+    def _drop(self, key):
+        entry = self.entries.pop(key)
+        self.bytes -= entry.size
+
+    def get(self, key, now):
+        # Returns (value, state), or (MISSING, None)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISSING, None
+        expired_for = now - entry.expires_at
+        if expired_for < 0:
+            state = FRESH
+            self.hits += 1
+        elif expired_for < self.policy.stale_while_revalidate:
+            state = REVALIDATE
+            self.stale_hits += 1
+        elif expired_for < self.policy.stale_if_error:
+            # Only served if the refresh fails, so it counts as a miss
+            state = IF_ERROR
+            self.misses += 1
+        else:
+            self._drop(key)
+            self.expirations += 1
+            self.misses += 1
+            return MISSING, None
+        self.entries.move_to_end(key)
+        return entry.value, state
+
+    def set(self, key, value, size, now, ttl=None, etag=None):
+        if size > self.policy.max_bytes:
+            return
+        if key in self.entries:
+            self._drop(key)
+        self.entries[key] = Entry(value, size, now + (self.policy.ttl if ttl is None else ttl), etag)
+        self.bytes += size
+        self._evict()
+
+    def _evict(self):
+        # Drop least recently used entries until the region is within budget
+        while len(self.entries) > self.policy.max_entries or self.bytes > self.policy.max_bytes:
+            oldest = next(iter(self.entries))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def stats(self):
+        return {
+            'entries': len(self.entries),
+            'bytes': self.bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'second_tier_hits': self.second_tier_hits,
+            'stale_hits': self.stale_hits,
+            'stale_if_error_hits': self.stale_if_error_hits,
+            'refreshes': self.refreshes,
+            'negative_hits': self.negative_hits,
+            'negative_checks': self.negative_checks,
+            'negative_false_positives': self.negative_false_positives,
+            **{f'negative_{name}': value for name, value in (self.negatives.stats() if self.negatives else {}).items()},
+        }
+
+
+class ResponseCache:
+    def __init__(self, policies, clock=time.monotonic):
+        self.clock = clock
+        self.regions = {endpoint: Region(policy, clock) for endpoint, policy in policies.items()}
+        self.lock = threading.Lock()
+        # Optional shared tier behind this one (see db_cache.DatabaseStore)
+        self.second_tier = None
+        # (endpoint, key) pairs with a background refresh queued or running
+        self.refreshing = set()
+
+    def get(self, endpoint, key):
+        # Returns (value, state) like Region.get, or (MISSING, NEGATIVE) for a
+        # recent no-result key; the second tier only holds fresh rows
+        with self.lock:
+            region = self.regions[endpoint]
+            value, state = region.get(key, self.clock())
+            if value is MISSING and region.negatives is not None and negative_key(key) in region.negatives:
+                region.negative_hits += 1
+                return MISSING, NEGATIVE
+        if value is MISSING and self.second_tier is not None:
+            args, language = key
+            stored = self.second_tier.get(endpoint, args, language)
+            if stored is not None:
+                value, ttl_left = stored
+                state = FRESH
+                self._set_local(endpoint, key, value, ttl_left)
+                with self.lock:
+                    self.regions[endpoint].second_tier_hits += 1
+        return value, state
+
+    def set_negative(self, endpoint, key):
+        # False if the endpoint has no negative filter
+        with self.lock:
+            negatives = self.regions[endpoint].negatives
+            if negatives is None:
+                return False
+            negatives.add(negative_key(key))
+            return True
+
+    def count(self, endpoint, field):
+        with self.lock:
+            region = self.regions[endpoint]
+            setattr(region, field, getattr(region, field) + 1)
+
+    def start_refresh(self, endpoint, key):
+        with self.lock:
+            if (endpoint, key) in self.refreshing:
+                return False
+            self.refreshing.add((endpoint, key))
+            self.regions[endpoint].refreshes += 1
+            return True
+
+    def finish_refresh(self, endpoint, key):
+        with self.lock:
+            self.refreshing.discard((endpoint, key))
+
+    def _set_local(self, endpoint, key, value, ttl=None):
+        # The payload is serialized once here to size it; its digest is the
+        # entry's validator, so HTTP ETags never need the body re-encoded
+        data = payload_bytes(value)
+        with self.lock:
+            self.regions[endpoint].set(key, value, len(data), self.clock(), ttl, digest(data))
+
+    def etag(self, endpoint, key):
+        # Validator of the stored entry, fresh or stale; None if not cached
+        with self.lock:
+            entry = self.regions[endpoint].entries.get(key)
+            return entry.etag if entry is not None else None
+
+    def servable(self, endpoint, key):
+        # True if get() would answer from memory without waiting on upstream
+        with self.lock:
+            region = self.regions[endpoint]
+            entry = region.entries.get(key)
+            return entry is not None and self.clock() - entry.expires_at < region.policy.stale_while_revalidate
+
+    def encoded(self, endpoint, key, encoding):
+        """Compressed payload bytes of a stored entry, compressed once and kept with it.
+
+        None if the key is not cached or its payload is under
+        compression.MIN_BYTES. The compressed bytes count towards the
+        region's byte budget and may evict older entries.
+        """
+        with self.lock:
+            region = self.regions[endpoint]
+            entry = region.entries.get(key)
+            if entry is None or (not entry.encoded and entry.size < compression.MIN_BYTES):
+                return None
+            body = entry.encoded.get(encoding)
+        if body is not None:
+            return body
+        body = compression.compress(payload_bytes(entry.value), encoding)
+        with self.lock:
+            if region.entries.get(key) is entry and encoding not in entry.encoded:
+                entry.encoded[encoding] = body
+                entry.size += len(body)
+                region.bytes += len(body)
+                region._evict()
+        return body
+
+    def set(self, endpoint, key, value):
+        self._set_local(endpoint, key, value)
+        if self.second_tier is not None:
+            args, language = key
+            self.second_tier.put(endpoint, args, language, value, self.regions[endpoint].policy.ttl)
+
+    def clear(self):
+        with self.lock:
+            for endpoint, region in list(self.regions.items()):
+                self.regions[endpoint] = Region(region.policy, self.clock)
+
+    def stats(self):
+        with self.lock:
+            return {endpoint: region.stats() for endpoint, region in self.regions.items()}
+
+
+def normalize_param(value):
+    if isinstance(value, str):
+        return fold(value)
+    return str(value)
+
+
+def make_key(args, language=LANGUAGE):
+    return (tuple(normalize_param(arg) for arg in args), language)
+
+
+def negative_key(key):
+    args, language = key
+    return '\x1f'.join(args + (language,)).encode('utf-8')
+
+
+response_cache = ResponseCache(POLICIES)
+
+# Concurrent misses for the same key share one upstream fetch
+flights = {endpoint: SingleFlight() for endpoint in POLICIES}
+
+
+# Background refreshes for entries served stale-while-revalidate
+_refresh_pool = ThreadPoolExecutor(max_workers=REFRESH_WORKERS, thread_name_prefix='cache-refresh')
+
+
+def _error_name(error):
+    # Not the message or traceback: request errors quote the URL, api_key included
+    return type(error).__name__
+
+
+def _refresh_in_background(endpoint, key, load):
+    if not response_cache.start_refresh(endpoint, key):
+        return
+
+    def run():
+        try:
+            flights[endpoint].do(key, load)
+        except Exception as error:
+            logger.warning('Background refresh of %s %r failed: %s', endpoint, key, _error_name(error))
+        finally:
+            response_cache.finish_refresh(endpoint, key)
+
+    _refresh_pool.submit(run)
+
+
+def _stale_if_error(endpoint, key, stale, refresh):
+    # Past the revalidate window: refresh now, but fall back to the stale value
+    try:
+        value = refresh()
+    except Exception as error:
+        logger.warning('Refresh of %s %r failed; serving stale: %s', endpoint, key, _error_name(error))
+        value = None
+    if value is None:
+        response_cache.count(endpoint, 'stale_if_error_hits')
+        return stale
+    return value
+
+
+def _negative_hit(endpoint):
+    # True to answer from the negative filter, False to re-check this one upstream
+    if random.random() >= NEGATIVE_VERIFY_RATE:
+        return True
+    response_cache.count(endpoint, 'negative_checks')
+    return False
+
+
+def _store(endpoint, key, value, empty):
+    if value is None:
+        return
+    if empty is None or value or not response_cache.set_negative(endpoint, key):
+        response_cache.set(endpoint, key, value)
+
+
+def _verified(endpoint, state, value):
+    if state is NEGATIVE and value:
+        response_cache.count(endpoint, 'negative_false_positives')
+    return value
+
+
+def cached(endpoint, empty=None):
+    """Cache a TMDB helper's result under (endpoint, normalized args, language).
+
+    None results are not cached, so failed lookups are retried. With an
+    empty factory (list, dict), falsy results mean "no matches" and go to
+    the endpoint's negative filter; later lookups of the key return
+    empty() without an upstream call. Expired entries are served stale per
+    the endpoint's Policy.
+    """
+    def decorator(func):
+        def load(key, args):
+            value = func(*args)
+            _store(endpoint, key, value, empty)
+            return value
+
+        @functools.wraps(func)
+        def wrapper(*args):
+            key = make_key(args)
+            value, state = response_cache.get(endpoint, key)
+            if state is FRESH:
+                return value
+            if state is NEGATIVE and _negative_hit(endpoint):
+                return empty()
+            if state is REVALIDATE:
+                _refresh_in_background(endpoint, key, lambda: load(key, args))
+                return value
+            if state is IF_ERROR:
+                return _stale_if_error(endpoint, key, value, lambda: flights[endpoint].do(key, lambda: load(key, args)))
+            return _verified(endpoint, state, flights[endpoint].do(key, lambda: load(key, args)))
+        wrapper.uncached = func
+        wrapper.etag = lambda *args: response_cache.etag(endpoint, make_key(args))
+        wrapper.is_cached = lambda *args: response_cache.servable(endpoint, make_key(args))
+        wrapper.encoded = lambda encoding, *args: response_cache.encoded(endpoint, make_key(args), encoding)
+        return wrapper
+    return decorator
+
+
+def cached_async(endpoint, empty=None):
+    """Coroutine version of cached(), sharing the same cache and flights."""
+    def decorator(func):
+        async def load(key, args):
+            value = await func(*args)
+            _store(endpoint, key, value, empty)
+            return value
+
+        @functools.wraps(func)
+        async def wrapper(*args):
+            key = make_key(args)
+            value, state = response_cache.get(endpoint, key)
+            if state is FRESH:
+                return value
+            if state is NEGATIVE and _negative_hit(endpoint):
+                return empty()
+            if state is REVALIDATE:
+                # The request's event loop closes with it, so refresh on a pool thread with its own loop
+                _refresh_in_background(endpoint, key, lambda: asyncio.run(load(key, args)))
+                return value
+            if state is IF_ERROR:
+                try:
+                    fresh = await flights[endpoint].do_async(key, lambda: load(key, args))
+                except Exception as error:
+                    logger.warning('Refresh of %s %r failed; serving stale: %s', endpoint, key, _error_name(error))
+                    fresh = None
+                if fresh is None:
+                    response_cache.count(endpoint, 'stale_if_error_hits')
+                    return value
+                return fresh
+            return _verified(endpoint, state, await flights[endpoint].do_async(key, lambda: load(key, args)))
+        wrapper.uncached = func
+        wrapper.etag = lambda *args: response_cache.etag(endpoint, make_key(args))
+        wrapper.is_cached = lambda *args: response_cache.servable(endpoint, make_key(args))
+        wrapper.encoded = lambda encoding, *args: response_cache.encoded(endpoint, make_key(args), encoding)
+        return wrapper
+    return decorator
+
+
+def flight_stats():
+    return {endpoint: flight.stats() for endpoint, flight in flights.items()}
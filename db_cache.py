@@ -0,0 +1,94 @@
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+
+from flask import has_app_context
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+
+from models import TmdbCacheEntry, db
+
+logger = logging.getLogger(__name__)
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def serialize_key(key):
+    return json.dumps(key, ensure_ascii=False, separators=(',', ':'))
+
+
+class DatabaseStore:
+    """Second cache tier shared by every worker through the configured database."""
+
+    def get(self, kind, key, lang):
+        # Returns (payload, seconds_left) or None
+        if not has_app_context():
+            return None
+        now = _utcnow()
+        try:
+            row = db.session.execute(
+                db.select(TmdbCacheEntry.payload, TmdbCacheEntry.expires_at).where(
+                    TmdbCacheEntry.kind == kind,
+                    TmdbCacheEntry.key == serialize_key(key),
+                    TmdbCacheEntry.lang == lang,
+                    TmdbCacheEntry.expires_at > now,
+                )
+            ).first()
+        except SQLAlchemyError:
+            logger.exception('tmdb_cache read failed')
+            db.session.rollback()
+            return None
+        if row is None:
+            return None
+        return row.payload, (row.expires_at - now).total_seconds()
+
+    def put(self, kind, key, lang, payload, ttl):
+        self.bulk_upsert([(kind, key, lang, payload, ttl)])
+
+    def bulk_upsert(self, items):
+        if not items or not has_app_context():
+            return
+        now = _utcnow()
+        rows = {}
+        for kind, key, lang, payload, ttl in items:
+            # Later duplicates win; Postgres rejects one statement touching a row twice
+            rows[(kind, serialize_key(key), lang)] = {
+                'kind': kind,
+                'key': serialize_key(key),
+                'lang': lang,
+                'payload': payload,
+                'fetched_at': now,
+                'expires_at': now + timedelta(seconds=ttl),
+            }
+        dialect = db.session.get_bind().dialect.name
+        if dialect == 'postgresql':
+            insert = postgresql.insert
+        elif dialect == 'sqlite':
+            insert = sqlite.insert
+        else:
+            logger.warning('tmdb_cache upsert is not supported on %s', dialect)
+            return
+        statement = insert(TmdbCacheEntry).values(list(rows.values()))
+        statement = statement.on_conflict_do_update(
+            index_elements=['kind', 'key', 'lang'],
+            set_={
+                'payload': statement.excluded.payload,
+                'fetched_at': statement.excluded.fetched_at,
+                'expires_at': statement.excluded.expires_at,
+            },
+        )
+        try:
+            db.session.execute(statement)
+            db.session.commit()
+        except SQLAlchemyError:
+            logger.exception('tmdb_cache upsert failed')
+            db.session.rollback()
+
+    def prune(self):
+        deleted = db.session.execute(
+            db.delete(TmdbCacheEntry).where(TmdbCacheEntry.expires_at <= _utcnow())
+        ).rowcount
+        db.session.commit()
+        return deleted
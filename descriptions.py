@@ -0,0 +1,81 @@
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+RELOAD_SECONDS = float(os.environ.get('DESCRIPTIONS_RELOAD_SECONDS', '30'))
+
+
+class DescriptionStore:
+    """Curated spoiler-free descriptions keyed by (media_type, TMDB id, language).
+
+    Entries come from a JSON file and, optionally, extra rows from the
+    database (which win over the file). Every RELOAD_SECONDS the next lookup
+    checks the file's mtime and re-reads the database, then swaps in the new
+    table, so edits go live without restarting workers.
+    """
+
+    def __init__(self, path, load_rows=None, reload_seconds=RELOAD_SECONDS):
+        self.path = path
+        self.load_rows = load_rows
+        self.reload_seconds = reload_seconds
+        self.entries = {}
+        self.version = 0
+        self._mtime = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.reload()
+
+    def _read_file(self):
+        try:
+            with open(self.path, encoding='utf-8') as data:
+                records = json.load(data)
+        except FileNotFoundError:
+            return []
+        return [
+            (record['media_type'], int(record['id']), record.get('language', 'tr-TR'), record['description'])
+            for record in records
+        ]
+
+    def reload(self):
+        with self._lock:
+            try:
+                mtime = os.path.getmtime(self.path)
+            except OSError:
+                mtime = None
+            rows = self.load_rows() if self.load_rows is not None else None
+            if mtime == self._mtime and rows is None:
+                self._checked_at = time.monotonic()
+                return False
+            try:
+                entries = {(media_type, tmdb_id, language): text
+                           for media_type, tmdb_id, language, text in self._read_file()}
+            except (ValueError, KeyError, TypeError):
+                # A half-saved or malformed file keeps the previous table
+                logger.exception('Could not load %s', self.path)
+                self._checked_at = time.monotonic()
+                return False
+            for media_type, tmdb_id, language, text in rows or ():
+                entries[(media_type, int(tmdb_id), language)] = text
+            if entries != self.entries:
+                self.entries = entries
+                self.version += 1
+            self._mtime = mtime
+            self._checked_at = time.monotonic()
+            return True
+
+    def get(self, media_type, tmdb_id, language='tr-TR'):
+        if time.monotonic() - self._checked_at >= self.reload_seconds:
+            # Claim this check so concurrent lookups keep using the current table
+            self._checked_at = time.monotonic()
+            self.reload()
+        try:
+            return self.entries.get((media_type, int(tmdb_id), language))
+        except (TypeError, ValueError):
+            return None
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,182 @@
+import math
+import os
+import re
+import sys
+import threading
+from array import array
+from collections import Counter
+
+from normalize import fold
+
+# Titles stop being indexed once the index would outgrow this. Each worker
+# holds its own copy: about 400 bytes per catalogue title, so the default
+# takes roughly 170k titles.
+MAX_BYTES = int(os.environ.get('FUZZY_MAX_BYTES', str(64 * 2**20)))
+# Measured per-title cost of the titles/keys list slots, the ids dict entry,
+# its int and the popularity slot, and per-trigram cost of a new posting
+# list with its dict entry and key string
+TITLE_OVERHEAD = 120
+POSTING_OVERHEAD = 180
+# Posting lists are read rarest trigram first until this many title ids have
+# been counted. Common trigrams ("the", " a ") say little about a match and
+# would otherwise make every lookup walk huge lists.
+SCAN_BUDGET = int(os.environ.get('FUZZY_SCAN_BUDGET', '20000'))
+CANDIDATES = 40
+# Popularity breaks ties between similar distances but never outweighs a
+# whole edit.
+POPULARITY_WEIGHT = 0.08
+MAX_POPULARITY_BONUS = 0.9
+
+
+_NUMBER = re.compile(r'\d+|\b(?=[ivxlc]+\b)c{0,3}(?:xc|xl|l?x{0,3})(?:ix|iv|v?i{0,3})\b')
+
+
+def numbers(key):
+    """Digit runs and Roman numerals in a folded title, in order."""
+    return [number for number in _NUMBER.findall(key) if number]
+
+
+def trigrams(key):
+    padded = f'  {key} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b, limit):
+    """Levenshtein distance, or limit + 1 once it is known to exceed limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b),
+            ))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def allowed_distance(key, loose=False):
+    # Short titles tolerate fewer typos before they match something else
+    if loose:
+        return max(1, len(key) // 3)
+    if len(key) >= 9:
+        return 2
+    if len(key) >= 5:
+        return 1
+    return 0
+
+
+class TitleMatcher:
+    """Trigram index over folded titles for typo-tolerant lookups."""
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.titles = []
+        self.keys = []
+        self.popularity = array('f')
+        self.ids = {}
+        self.postings = {}
+        self.lock = threading.Lock()
+        self._loader_pid = None
+
+    def __len__(self):
+        return len(self.titles)
+
+    def add(self, title, popularity=0.0):
+        key = fold(title)
+        if not key:
+            return
+        with self.lock:
+            title_id = self.ids.get(key)
+            if title_id is not None:
+                if popularity > self.popularity[title_id]:
+                    self.popularity[title_id] = popularity
+                return
+            grams = trigrams(key)
+            size = (sys.getsizeof(title) + sys.getsizeof(key) + TITLE_OVERHEAD + 4 * len(grams)
+                    + POSTING_OVERHEAD * sum(gram not in self.postings for gram in grams))
+            if self.bytes + size > self.max_bytes:
+                return
+            self.bytes += size
+            title_id = len(self.titles)
+            # match() reads without the lock: publish the id only once its title is stored
+            self.titles.append(title)
+            self.keys.append(key)
+            self.popularity.append(popularity)
+            for gram in grams:
+                posting = self.postings.get(gram)
+                if posting is None:
+                    posting = self.postings[gram] = array('I')
+                posting.append(title_id)
+            self.ids[key] = title_id
+
+    def add_many(self, entries):
+        for title, popularity in entries:
+            self.add(title, popularity)
+
+    def load_in_background(self, source):
+        """Index the (title, popularity) pairs source() returns on a daemon thread, once per process.
+
+        match() answers from whatever has been indexed so far.
+        """
+        pid = os.getpid()
+        if self._loader_pid == pid:
+            return
+        with self.lock:
+            if self._loader_pid == pid:
+                return
+            self._loader_pid = pid
+        threading.Thread(target=lambda: self.add_many(source()), name='title-index', daemon=True).start()
+
+    def _candidates(self, key):
+        postings = sorted(
+            (posting for posting in map(self.postings.get, trigrams(key)) if posting is not None),
+            key=len,
+        )
+        counts = Counter()
+        scanned = 0
+        for posting in postings:
+            if counts and scanned + len(posting) > SCAN_BUDGET:
+                break
+            counts.update(posting)
+            scanned += len(posting)
+        return [title_id for title_id, _ in counts.most_common(CANDIDATES)]
+
+    def match(self, query, loose=False):
+        """Return (title, distance) for the best match within the allowed distance."""
+        key = fold(query)
+        if not key:
+            return None
+        exact = self.ids.get(key)
+        if exact is not None:
+            return self.titles[exact], 0
+        limit = allowed_distance(key, loose)
+        if limit == 0:
+            return None
+        # "Rocky IV" is not a typo of "Rocky II", nor "Scream 3" of "Scream 2"
+        query_numbers = numbers(key)
+        best = None
+        for title_id in self._candidates(key):
+            distance = edit_distance(key, self.keys[title_id], limit)
+            if distance > limit or numbers(self.keys[title_id]) != query_numbers:
+                continue
+            bonus = min(MAX_POPULARITY_BONUS, POPULARITY_WEIGHT * math.log1p(self.popularity[title_id]))
+            score = distance - bonus
+            if best is None or score < best[0]:
+                best = (score, title_id, distance)
+        if best is None:
+            return None
+        return self.titles[best[1]], best[2]
+
+    def memory_bytes(self):
+        # Estimated whole footprint: title and key strings, the lists, the
+        # ids dict and the postings, as counted against max_bytes
+        return self.bytes
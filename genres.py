@@ -0,0 +1,68 @@
+import os
+import threading
+import time
+
+import requests
+
+import json_codec
+import tmdb_client
+
+# Genre id -> name tables for /genre/movie/list and /genre/tv/list, fetched
+# once per worker and refreshed daily. Search hits carry genre_ids, so with
+# these tables /search no longer needs a detail call just to name genres.
+REFRESH_SECONDS = int(os.environ.get('GENRE_TABLE_TTL', str(24 * 60 * 60)))
+# After a failed fetch, wait this long before asking TMDB again
+RETRY_SECONDS = 60
+
+_tables = {}
+_loaded_at = {}
+_retry_at = {}
+# One lock per table so the movie and tv lists can load concurrently
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def _fetch(base_url, api_key, media_type, language):
+    try:
+        response = tmdb_client.get(f"{base_url}/genre/{media_type}/list", params={
+            'api_key': api_key,
+            'language': language
+        })
+    except requests.RequestException:
+        return None
+    if response.status_code != 200:
+        return None
+    return {genre['id']: genre['name'] for genre in json_codec.response_json(response).get('genres', [])}
+
+
+def _due(key):
+    if time.monotonic() < _retry_at.get(key, 0):
+        return False
+    return key not in _tables or time.monotonic() - _loaded_at[key] >= REFRESH_SECONDS
+
+
+def get_table(base_url, api_key, media_type, language='tr-TR'):
+    """Genre id -> name table, or None if TMDB has not provided one yet."""
+    key = (media_type, language)
+    if not _due(key):
+        return _tables.get(key)
+    with _locks_guard:
+        lock = _locks.setdefault(key, threading.Lock())
+    with lock:
+        if _due(key):
+            fresh = _fetch(base_url, api_key, media_type, language)
+            if fresh is not None:
+                _tables[key] = fresh
+                _loaded_at[key] = time.monotonic()
+            else:
+                # Keep serving the old table, if any, while TMDB is unavailable
+                _retry_at[key] = time.monotonic() + RETRY_SECONDS
+        return _tables.get(key)
+
+
+def genre_names(base_url, api_key, media_type, genre_ids, language='tr-TR'):
+    # None if no table is available
+    table = get_table(base_url, api_key, media_type, language)
+    if table is None:
+        return None
+    return [table[genre_id] for genre_id in genre_ids if genre_id in table]
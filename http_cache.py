@@ -0,0 +1,83 @@
+import os
+
+from flask import current_app, jsonify, request
+
+import compression
+from cache import digest
+
+# Browser and CDN caching for the JSON endpoints. Bodies are validated by
+# strong ETags derived from the response cache's stored digests, so a
+# matching If-None-Match is answered 304 without encoding the body.
+# Compressed bodies are separate representations, so their ETags carry the
+# coding as a suffix ("<digest>-gzip").
+
+
+def _cache_control(endpoint, max_age, stale_while_revalidate):
+    prefix = f'HTTP_{endpoint.upper()}_'
+    max_age = int(os.environ.get(prefix + 'MAX_AGE', max_age))
+    stale_while_revalidate = int(os.environ.get(prefix + 'STALE_WHILE_REVALIDATE', stale_while_revalidate))
+    return f'public, max-age={max_age}, stale-while-revalidate={stale_while_revalidate}'
+
+
+CACHE_CONTROL = {
+    'search': _cache_control('search', 5 * 60, 60 * 60),
+    'autocomplete': _cache_control('autocomplete', 5 * 60, 10 * 60),
+    'details': _cache_control('details', 60 * 60, 24 * 60 * 60),
+}
+
+
+def etag(*parts):
+    """Strong ETag over already-computed validators and short strings."""
+    return '"' + digest('\x1f'.join(str(part) for part in parts).encode('utf-8')) + '"'
+
+
+def _variant(validator, encoding):
+    return f'{validator[:-1]}-{encoding}"'
+
+
+def json_response(endpoint, payload, validator=None, status=200, encoded=None):
+    """JSON response with caching headers, or 304 if the client's copy is current.
+
+    encoded(encoding) may return precompressed bytes of the body (see
+    ResponseCache.encoded); otherwise the body is encoded with jsonify()
+    and left to compress_response().
+    """
+    headers = {'Cache-Control': CACHE_CONTROL[endpoint], 'Vary': 'Accept-Encoding'}
+    encoding = compression.negotiate(request.headers.get('Accept-Encoding'))
+    if validator is not None:
+        headers['ETag'] = validator
+        for candidate in (validator, _variant(validator, encoding)) if encoding else (validator,):
+            if request.if_none_match.contains_weak(candidate.strip('"')):
+                headers['ETag'] = candidate
+                return '', 304, headers
+    body = encoded(encoding) if encoded is not None and encoding else None
+    if body is not None:
+        if validator is not None:
+            headers['ETag'] = _variant(validator, encoding)
+        headers['Content-Encoding'] = encoding
+        return current_app.response_class(body, status, headers, mimetype='application/json')
+    return jsonify(payload), status, headers
+
+
+def uncached_error(message, status):
+    # For failures that must not be kept by browsers or CDNs, unlike a 404 no-match
+    return jsonify({'error': message}), status, {'Cache-Control': 'no-store'}
+
+
+def compress_response(response):
+    # after_request hook for JSON bodies that were not precompressed
+    if (response.direct_passthrough or response.status_code in (204, 304) or response.status_code < 200
+            or 'Content-Encoding' in response.headers or response.mimetype != 'application/json'):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = compression.negotiate(request.headers.get('Accept-Encoding'))
+    if encoding is None:
+        return response
+    data = response.get_data()
+    if len(data) < compression.MIN_BYTES:
+        return response
+    response.set_data(compression.compress(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    if 'ETag' in response.headers:
+        response.headers['ETag'] = _variant(response.headers['ETag'], encoding)
+    return response
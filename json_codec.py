@@ -0,0 +1,69 @@
+import json
+import os
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pip install orjson for the fast encoder
+    orjson = None
+
+# JSON encoding and decoding for responses, request bodies, cached payloads
+# and upstream TMDB bodies. orjson is used when it is installed, unless
+# JSON_CODEC=stdlib; both produce the same compact UTF-8 documents.
+USE_ORJSON = orjson is not None and os.environ.get('JSON_CODEC', 'orjson') != 'stdlib'
+NAME = 'orjson' if USE_ORJSON else 'stdlib'
+
+
+def dumps(value):
+    """Compact UTF-8 JSON bytes, keys in insertion order."""
+    if USE_ORJSON:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def loads(data):
+    """Parse JSON from str or UTF-8 bytes."""
+    return orjson.loads(data) if USE_ORJSON else json.loads(data)
+
+
+def response_json(response):
+    # Drop-in for requests' Response.json()
+    return loads(response.content)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider encoding with orjson.
+
+    Output matches DefaultJSONProvider's (sorted keys, dates as HTTP dates,
+    dataclasses and __html__ through default()) except that non-ASCII text
+    is sent as UTF-8 rather than \\u escapes. Calls with json.dumps/loads
+    keyword arguments go to the stdlib implementation.
+    """
+
+    def _option(self, indent=False):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._option()).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(obj, default=self.default, option=self._option(indent) | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+JSONProvider = OrjsonProvider if USE_ORJSON else DefaultJSONProvider
@@ -0,0 +1,153 @@
+import threading
+from bisect import bisect_left
+
+# In-process counters and histograms rendered in the Prometheus text format
+# at /metrics. Recording is a bisect plus a few additions under a per-metric
+# lock; values owned elsewhere (cache and single-flight stats) are read by
+# collectors at scrape time instead of being recorded per request.
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SERIALIZE_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=''):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        return [(self.name, _labels(self.labelnames, labels), value) for labels, value in sorted(values)]
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        # labels -> [count per bucket (the last one is +Inf), sum]
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            child = self._children.get(labels)
+            if child is None:
+                child = self._children[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            child[0][index] += 1
+            child[1] += value
+
+    def samples(self):
+        with self._lock:
+            children = [(labels, list(counts), total) for labels, (counts, total) in self._children.items()]
+        rows = []
+        for labels, counts, total in sorted(children):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else str(bound)
+                rows.append((f'{self.name}_bucket', _labels(self.labelnames, labels, f'le="{le}"'), cumulative))
+            rows.append((f'{self.name}_sum', _labels(self.labelnames, labels), total))
+            rows.append((f'{self.name}_count', _labels(self.labelnames, labels), cumulative))
+        return rows
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+
+    def counter(self, name, help, labelnames=()):
+        metric = Counter(name, help, labelnames)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        metric = Histogram(name, help, labelnames, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def collector(self, func):
+        """Register func() -> [(name, kind, help, labelnames, {labels: value})], read at scrape time."""
+        self.collectors.append(func)
+        return func
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(f'{name}{labels} {value}' for name, labels, value in metric.samples())
+        for collect in self.collectors:
+            for name, kind, help, labelnames, values in collect():
+                lines.append(f'# HELP {name} {help}')
+                lines.append(f'# TYPE {name} {kind}')
+                lines.extend(
+                    f'{name}{_labels(labelnames, labels)} {value}' for labels, value in sorted(values.items())
+                )
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+REQUEST_SECONDS = registry.histogram(
+    'http_request_duration_seconds', 'Time spent handling a request in Flask.', ('route', 'method')
+)
+RESPONSES = registry.counter('http_responses_total', 'Responses sent, by status code.', ('route', 'method', 'status'))
+REQUEST_ERRORS = registry.counter('http_request_errors_total', 'Responses with a 5xx status.', ('route', 'method'))
+RESPONSE_BYTES = registry.counter('http_response_bytes_total', 'Response body bytes sent.', ('route',))
+SERIALIZE_SECONDS = registry.histogram(
+    'json_serialize_seconds', 'Time spent encoding JSON response bodies.', buckets=SERIALIZE_BUCKETS
+)
+UPSTREAM_SECONDS = registry.histogram(
+    'tmdb_request_duration_seconds', 'TMDB call latency, connect through body.', ('endpoint',)
+)
+UPSTREAM_ERRORS = registry.counter(
+    'tmdb_request_errors_total', 'TMDB calls that raised or returned a 5xx/429.', ('endpoint', 'reason')
+)
+UPSTREAM_BYTES = registry.counter('tmdb_response_bytes_total', 'TMDB response body bytes received.', ('endpoint',))
+
+
+def observe_request(route, method, status, seconds, size):
+    REQUEST_SECONDS.observe((route, method), seconds)
+    RESPONSES.inc((route, method, status))
+    if status >= 500:
+        REQUEST_ERRORS.inc((route, method))
+    if size:
+        RESPONSE_BYTES.inc((route,), size)
+
+
+def observe_upstream(endpoint, seconds, status=None, size=0):
+    UPSTREAM_SECONDS.observe((endpoint,), seconds)
+    if status is None:
+        UPSTREAM_ERRORS.inc((endpoint, 'exception'))
+    elif status >= 500 or status == 429:
+        UPSTREAM_ERRORS.inc((endpoint, str(status)))
+    if size:
+        UPSTREAM_BYTES.inc((endpoint,), size)
@@ -0,0 +1,36 @@
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.dialects.postgresql import JSONB
+
+db = SQLAlchemy()
+
+
+class TmdbCacheEntry(db.Model):
+    __tablename__ = 'tmdb_cache'
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(32), nullable=False)
+    key = db.Column(db.Text, nullable=False)
+    lang = db.Column(db.String(16), nullable=False)
+    # JSONB on Postgres; plain JSON text on SQLite for local runs
+    payload = db.Column(db.JSON().with_variant(JSONB(), 'postgresql'), nullable=False)
+    fetched_at = db.Column(db.DateTime, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    __table_args__ = (
+        db.Index('ix_tmdb_cache_kind_key_lang', 'kind', 'key', 'lang', unique=True),
+    )
+
+
+class CuratedDescription(db.Model):
+    __tablename__ = 'curated_descriptions'
+
+    id = db.Column(db.Integer, primary_key=True)
+    media_type = db.Column(db.String(8), nullable=False)
+    tmdb_id = db.Column(db.Integer, nullable=False)
+    language = db.Column(db.String(16), nullable=False, default='tr-TR')
+    description = db.Column(db.Text, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_curated_descriptions_lookup', 'media_type', 'tmdb_id', 'language', unique=True),
+    )
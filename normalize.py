@@ -0,0 +1,41 @@
+import re
+import unicodedata
+from functools import lru_cache
+
+# Turkish I's fold to a plain "i" before anything else: "İ".lower() would give
+# "i" plus a combining dot, and "I"/"ı" must match "i" in typed queries.
+_TURKISH_I = str.maketrans({'İ': 'i', 'I': 'i', 'ı': 'i'})
+# Apostrophes and periods join ("Schindler's", "G.O.R.A."); other punctuation splits
+_JOINERS = str.maketrans('', '', "'’ʼ`´.")
+_PUNCTUATION = re.compile(r'[\W_]+')
+# Only Latin-script accents are dropped; kana voicing marks and Hangul jamo
+# recompose through NFC so CJK titles keep their meaning.
+_LATIN_ACCENTS = re.compile('[\u0300-\u036f]')
+
+
+def _strip_diacritics(text):
+    decomposed = unicodedata.normalize('NFKD', text)
+    return unicodedata.normalize('NFC', _LATIN_ACCENTS.sub('', decomposed))
+
+
+@lru_cache(maxsize=65536)
+def fold(text):
+    """Normalize a title or query for matching and cache keys.
+
+    Turkish-aware I folding, casefolding, diacritic removal, punctuation
+    stripping and whitespace collapse: "İnception", "ınception" and
+    " INCEPTION! " all fold to "inception".
+    """
+    text = text.translate(_TURKISH_I).casefold()
+    if not text.isascii():
+        text = _strip_diacritics(text)
+    text = text.translate(_JOINERS)
+    return ' '.join(_PUNCTUATION.sub(' ', text).split())
+
+
+_TURKISH_UPPER = str.maketrans({'İ': 'i', 'I': 'ı'})
+
+
+def lower(text):
+    """Lowercase with Turkish I rules, keeping diacritics ("ölür" is not "olur")."""
+    return text.translate(_TURKISH_UPPER).lower()
@@ -0,0 +1,238 @@
+import cProfile
+import json
+import logging
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'spoilerless-profiles'))
+# Share of requests run under cProfile, 0.0-1.0
+SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', '0'))
+# Requests slower than this keep the stacks the sampler caught; 0 disables
+SLOW_SECONDS = float(os.environ.get('PROFILE_SLOW_SECONDS', '2'))
+SAMPLE_INTERVAL = float(os.environ.get('PROFILE_SAMPLE_INTERVAL', '0.005'))
+KEEP_FILES = int(os.environ.get('PROFILE_KEEP_FILES', '200'))
+# JSON settings polled by every worker, e.g. {"enabled": true, "sample_rate": 0.01}
+CONTROL_PATH = os.environ.get('PROFILE_CONTROL_PATH', os.path.join(PROFILE_DIR, 'control.json'))
+CONTROL_POLL_SECONDS = float(os.environ.get('PROFILE_CONTROL_POLL_SECONDS', '5'))
+SETTINGS = ('enabled', 'sample_rate', 'slow_seconds', 'sample_interval', 'keep_files')
+
+_UNSAFE = re.compile(r'[^A-Za-z0-9_.-]+')
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+
+
+def collapse(frame):
+    # Root-first frame names joined by ';', the input format of flamegraph.pl and speedscope
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class _Trace:
+    __slots__ = ('label', 'started', 'stacks', 'profile')
+
+    def __init__(self, label, profile):
+        self.label = label
+        self.started = time.perf_counter()
+        self.stacks = Counter()
+        self.profile = profile
+
+
+class RequestProfiler:
+    """Profile a share of requests, and keep stack samples of slow ones.
+
+    A sampled request runs under cProfile and is always written out as a
+    .pstats file. While slow-request capture is on, a background thread
+    records the stack of every thread serving a request each
+    sample_interval; if the request ends up slower than slow_seconds, its
+    stacks are written as a .collapsed file for flame graphs. Only the
+    newest keep_files profiles are kept. When disabled, begin() and end()
+    return after one attribute check.
+
+    Settings can be changed at runtime with configure(), or for every
+    worker at once by writing them to the control file, which a watcher
+    thread re-reads when its mtime changes. Threads do not survive fork, so
+    none start until start() runs in the serving process (the app calls it
+    on every request; only the first in each process does anything).
+
+    Both work per thread, so the async routes, whose coroutines run on an
+    asgiref worker thread, are only partly covered.
+    """
+
+    def __init__(self, directory=PROFILE_DIR, enabled=False, sample_rate=SAMPLE_RATE, slow_seconds=SLOW_SECONDS,
+                 sample_interval=SAMPLE_INTERVAL, keep_files=KEEP_FILES, control_path=CONTROL_PATH):
+        self.directory = directory
+        self.control_path = control_path
+        self.enabled = False
+        self.sample_rate = sample_rate
+        self.slow_seconds = slow_seconds
+        self.sample_interval = sample_interval
+        self.keep_files = keep_files
+        self.written = 0
+        self._active = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._sampler = None
+        self._stop = threading.Event()
+        self._control_mtime = None
+        # Process the threads were started in
+        self._pid = None
+        self.configure(enabled=enabled)
+
+    def start(self):
+        """Start the control watcher and, if wanted, the sampler in this process."""
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            self._pid = pid
+            # Left over from the parent process, whose threads did not come along
+            self._sampler = None
+            self._active.clear()
+            self._control_mtime = None
+        if self.control_path:
+            threading.Thread(target=self._watch_control, name='request-profiler-control', daemon=True).start()
+        self.configure()
+
+    def settings(self):
+        return {
+            'enabled': self.enabled,
+            'sample_rate': self.sample_rate,
+            'slow_seconds': self.slow_seconds,
+            'sample_interval': self.sample_interval,
+            'keep_files': self.keep_files,
+            'directory': self.directory,
+            'written': self.written,
+        }
+
+    def configure(self, enabled=None, sample_rate=None, slow_seconds=None, sample_interval=None, keep_files=None):
+        with self._lock:
+            if sample_rate is not None:
+                self.sample_rate = min(1.0, max(0.0, float(sample_rate)))
+            if slow_seconds is not None:
+                self.slow_seconds = max(0.0, float(slow_seconds))
+            if sample_interval is not None:
+                self.sample_interval = max(0.001, float(sample_interval))
+            if keep_files is not None:
+                self.keep_files = max(1, int(keep_files))
+            if enabled is not None:
+                self.enabled = bool(enabled)
+            wants_sampler = self.enabled and self.slow_seconds > 0 and self._pid == os.getpid()
+            if wants_sampler and self._sampler is None:
+                # A fresh event per thread, so a quick off/on cannot revive the old sampler
+                self._stop = threading.Event()
+                self._sampler = threading.Thread(target=self._sample, args=(self._stop,), name='request-profiler',
+                                                 daemon=True)
+                self._sampler.start()
+            elif not wants_sampler and self._sampler is not None:
+                self._stop.set()
+                self._sampler = None
+                self._active.clear()
+        return self.settings()
+
+    def _watch_control(self):
+        while True:
+            try:
+                mtime = os.path.getmtime(self.control_path)
+            except OSError:
+                mtime = None
+            if mtime is not None and mtime != self._control_mtime:
+                self._control_mtime = mtime
+                try:
+                    with open(self.control_path, encoding='utf-8') as control:
+                        settings = json.load(control)
+                    self.configure(**{name: settings[name] for name in SETTINGS if name in settings})
+                    logger.info('Request profiler settings: %s', self.settings())
+                except (OSError, ValueError, TypeError, AttributeError):
+                    logger.exception('Ignoring unreadable profiler control file %s', self.control_path)
+            time.sleep(CONTROL_POLL_SECONDS)
+
+    def write_control(self, **settings):
+        # Merged into the current file, so workers started later see every setting
+        try:
+            with open(self.control_path, encoding='utf-8') as control:
+                settings = {**json.load(control), **settings}
+        except (OSError, ValueError):
+            pass
+        os.makedirs(os.path.dirname(os.path.abspath(self.control_path)), exist_ok=True)
+        with open(self.control_path, 'w', encoding='utf-8') as control:
+            json.dump(settings, control)
+
+    def _sample(self, stop):
+        while not stop.wait(self.sample_interval):
+            if not self._active:
+                continue
+            frames = sys._current_frames()
+            for ident, trace in list(self._active.items()):
+                frame = frames.get(ident)
+                if frame is not None:
+                    trace.stacks[collapse(frame)] += 1
+
+    def begin(self, label):
+        if not self.enabled:
+            return
+        profile = None
+        if self.sample_rate and random.random() < self.sample_rate:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Another profiler already owns this thread
+                profile = None
+        trace = _Trace(label, profile)
+        self._local.trace = trace
+        if self._sampler is not None:
+            self._active[threading.get_ident()] = trace
+
+    def end(self):
+        trace = getattr(self._local, 'trace', None)
+        if trace is None:
+            return
+        self._local.trace = None
+        self._active.pop(threading.get_ident(), None)
+        elapsed = time.perf_counter() - trace.started
+        if trace.profile is not None:
+            trace.profile.disable()
+        slow = self.slow_seconds and elapsed >= self.slow_seconds and trace.stacks
+        if trace.profile is None and not slow:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            label = _UNSAFE.sub('_', trace.label).strip('_') or 'root'
+            stamp = f'{time.strftime("%Y%m%dT%H%M%S")}-{time.time_ns() % 10**9:09d}'
+            stem = os.path.join(self.directory, f'{stamp}-{label}-{elapsed * 1000:.0f}ms')
+            if trace.profile is not None:
+                trace.profile.dump_stats(f'{stem}.pstats')
+                self.written += 1
+            if slow:
+                with open(f'{stem}.collapsed', 'w', encoding='utf-8') as output:
+                    for stack, count in trace.stacks.most_common():
+                        output.write(f'{stack} {count}\n')
+                self.written += 1
+            self._rotate()
+        except OSError:
+            logger.exception('Could not write a request profile to %s', self.directory)
+
+    def _rotate(self):
+        names = sorted(name for name in os.listdir(self.directory) if name.endswith(('.pstats', '.collapsed')))
+        for name in names[:max(0, len(names) - self.keep_files)]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
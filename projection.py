@@ -0,0 +1,83 @@
+# Field projection for /details. TMDB detail documents are trimmed to
+# ALLOWED before they are cached, and each response carries the fields the
+# client asked for with `fields=`, or DEFAULT_FIELDS: what the page's
+# tagline and "more details" popup read. Overviews, season lists and
+# episode records are never sent, since they are where plot spoilers live.
+
+# Field -> None to keep the value as-is, or the keys kept on each object of a list
+ALLOWED = {
+    'id': None,
+    'media_type': None,
+    'title': None,
+    'name': None,
+    'original_title': None,
+    'original_name': None,
+    'original_language': None,
+    'tagline': None,
+    'status': None,
+    'popularity': None,
+    'vote_average': None,
+    'vote_count': None,
+    'poster_path': None,
+    'backdrop_path': None,
+    'homepage': None,
+    'genres': ('id', 'name'),
+    'production_companies': ('id', 'name', 'origin_country'),
+    'production_countries': ('iso_3166_1', 'name'),
+    'spoken_languages': ('iso_639_1', 'name'),
+    'origin_country': None,
+    # Movies
+    'release_date': None,
+    'runtime': None,
+    'budget': None,
+    'revenue': None,
+    'imdb_id': None,
+    # TV
+    'first_air_date': None,
+    'last_air_date': None,
+    'episode_run_time': None,
+    'number_of_seasons': None,
+    'number_of_episodes': None,
+    'in_production': None,
+    'networks': ('id', 'name', 'origin_country'),
+    'created_by': ('id', 'name'),
+}
+
+DEFAULT_FIELDS = (
+    'id', 'media_type', 'tagline', 'release_date', 'first_air_date', 'runtime', 'episode_run_time', 'status',
+    'production_companies', 'original_language', 'budget', 'number_of_seasons', 'popularity',
+)
+
+
+def parse_fields(value):
+    """Fields named by a `fields=` parameter; raises ValueError for unknown ones."""
+    if not value:
+        return DEFAULT_FIELDS
+    if value == 'all':
+        return tuple(ALLOWED)
+    fields = tuple(dict.fromkeys(field.strip() for field in value.split(',') if field.strip()))
+    if not fields:
+        # Only separators, as in "fields=,"
+        return DEFAULT_FIELDS
+    unknown = [field for field in fields if field not in ALLOWED]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+def trim(document, media_type):
+    # The cached form of a TMDB detail document
+    trimmed = {}
+    for field, keys in ALLOWED.items():
+        if field not in document:
+            continue
+        value = document[field]
+        if keys is not None and isinstance(value, list):
+            value = [{key: item[key] for key in keys if key in item} for item in value if isinstance(item, dict)]
+        trimmed[field] = value
+    trimmed['media_type'] = media_type
+    return trimmed
+
+
+def select(document, fields):
+    return {field: document[field] for field in fields if field in document}
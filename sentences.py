@@ -0,0 +1,66 @@
+import re
+from itertools import islice
+
+# Candidate sentence ends: terminal punctuation, optionally closed by quotes
+# or brackets, followed by whitespace or the end of the text. Decimals
+# ("3.5") never match because no whitespace follows the period.
+_BOUNDARY = re.compile(r'(?:\.\.\.|…|[.!?]+)["\'”’»)\]]*(?=\s|$)')
+_NEXT_CHAR = re.compile(r'\s*(\S)')
+_WORD_BEFORE = re.compile(r'(\w+)$')
+
+# Lowercased, without the trailing period
+ABBREVIATIONS = frozenset('''
+    dr prof doç doc av sn st mr mrs ms jr sr vb vs vd örn orn ör bkz yy no
+    nu sf mah cad sok apt gen org alb yzb kom ltd şti sti inc vol ed dk yak
+    hz mö
+'''.split())
+_ROMAN_NUMERAL = re.compile(r'^[IVXLC]{2,}$')
+
+
+def _is_boundary(text, match):
+    end = match.end()
+    following = _NEXT_CHAR.match(text, end)
+    if following is None:
+        return True
+    # A new sentence does not start in lowercase: "20. yüzyıl", "vb. şeyler"
+    if following.group(1).islower():
+        return False
+    punctuation = match.group()
+    if punctuation[0] != '.' or punctuation.startswith('...'):
+        return True
+    word = _WORD_BEFORE.search(text, max(0, match.start() - 24), match.start())
+    if word is None:
+        return True
+    word = word.group(1)
+    if len(word) == 1 and word.isupper():
+        # An initial: "J. R. R. Tolkien"
+        return False
+    if word.isdigit() and len(word) <= 3:
+        # A Turkish ordinal: "2. Dünya Savaşı", "3. Sezon"; years still end sentences
+        return False
+    if _ROMAN_NUMERAL.match(word):
+        # A regnal or ordinal numeral: "II. Elizabeth"
+        return False
+    return word.lower() not in ABBREVIATIONS
+
+
+def iter_sentences(text):
+    """Yield sentences lazily; scanning stops when the caller stops iterating."""
+    start = 0
+    for match in _BOUNDARY.finditer(text):
+        if _is_boundary(text, match):
+            sentence = text[start:match.end()].strip()
+            if sentence:
+                yield sentence
+            start = match.end()
+    rest = text[start:].strip()
+    if rest:
+        yield rest
+
+
+def first_sentences(text, count):
+    return ' '.join(islice(iter_sentences(text), count))
+
+
+def first_sentences_batch(texts, count):
+    return [first_sentences(text, count) if text else '' for text in texts]
@@ -0,0 +1,106 @@
+import re
+import zlib
+
+try:
+    import numpy as np
+except ImportError:  # the classifier is optional; callers fall back to rules
+    np = None
+
+from normalize import lower
+
+DEFAULT_FEATURES = 2 ** 18
+_TOKEN = re.compile(r'\w+')
+
+
+def sentence_features(sentence, num_features):
+    """Hashed unigram and bigram ids; crc32 keeps them stable across processes."""
+    tokens = _TOKEN.findall(lower(sentence))
+    grams = tokens + [f'{first} {second}' for first, second in zip(tokens, tokens[1:])]
+    return [zlib.crc32(gram.encode('utf-8')) % num_features for gram in grams]
+
+
+def _feature_matrix(sentences, num_features):
+    # Sparse rows as parallel (feature id, sentence number) arrays
+    features, owners = [], []
+    for number, sentence in enumerate(sentences):
+        ids = sentence_features(sentence, num_features)
+        features.extend(ids)
+        owners.extend([number] * len(ids))
+    return np.asarray(features, dtype=np.intp), np.asarray(owners, dtype=np.intp)
+
+
+def _sigmoid(logits):
+    return 1.0 / (1.0 + np.exp(-logits))
+
+
+class SpoilerModel:
+    """Linear spoiler classifier over hashed n-grams.
+
+    The artifact is one float32 .npy vector: a weight per hashed feature,
+    with the bias as the last element. It is opened as a memory map so
+    workers share the pages instead of each holding a copy.
+    """
+
+    def __init__(self, weights):
+        self.weights = weights
+        self.num_features = len(weights) - 1
+        self.bias = float(weights[-1])
+
+    @classmethod
+    def load(cls, path):
+        return cls(np.load(path, mmap_mode='r'))
+
+    def score(self, sentences):
+        """Spoiler probability for each sentence, in one vectorized pass."""
+        if not sentences:
+            return np.zeros(0)
+        features, owners = _feature_matrix(sentences, self.num_features)
+        logits = np.bincount(owners, weights=self.weights[features], minlength=len(sentences))
+        return _sigmoid(logits + self.bias)
+
+    def keep_safe_batch(self, sentence_lists, threshold):
+        """Drop sentences scoring at or above threshold from many overviews at once."""
+        flat = [sentence for sentences in sentence_lists for sentence in sentences]
+        safe = self.score(flat) < threshold
+        kept, position = [], 0
+        for sentences in sentence_lists:
+            kept.append([sentence for sentence, ok in zip(sentences, safe[position:position + len(sentences)]) if ok])
+            position += len(sentences)
+        return kept
+
+    def keep_safe(self, sentences, threshold):
+        return self.keep_safe_batch([sentences], threshold)[0]
+
+
+def train(examples, num_features=DEFAULT_FEATURES, epochs=300, learning_rate=0.5, l2=1e-6):
+    """Fit weights by full-batch logistic regression on (label, sentence) pairs."""
+    labels = np.asarray([label for label, _ in examples], dtype=np.float64)
+    features, owners = _feature_matrix([sentence for _, sentence in examples], num_features)
+    weights = np.zeros(num_features, dtype=np.float64)
+    bias = 0.0
+    count = len(labels)
+    for _ in range(epochs):
+        logits = np.bincount(owners, weights=weights[features], minlength=count) + bias
+        error = _sigmoid(logits) - labels
+        gradient = np.bincount(features, weights=error[owners], minlength=num_features) / count
+        weights -= learning_rate * (gradient + l2 * weights)
+        bias -= learning_rate * error.mean()
+    return np.append(weights, bias).astype(np.float32)
+
+
+def read_examples(path):
+    """Read "label<TAB>sentence" lines, label 1 for spoilers and 0 otherwise."""
+    with open(path, encoding='utf-8') as data:
+        for line in data:
+            label, _, sentence = line.rstrip('\n').partition('\t')
+            if sentence:
+                yield int(label), sentence
+
+
+def load_if_available(path):
+    if np is None:
+        return None
+    try:
+        return SpoilerModel.load(path)
+    except FileNotFoundError:
+        return None
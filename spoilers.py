@@ -0,0 +1,146 @@
+import json
+import os
+from collections import deque
+from functools import lru_cache
+from itertools import islice
+
+from normalize import lower
+from sentences import iter_sentences
+
+# Terms and text are compared with dotted and dotless i as one letter:
+# Turkish lowercasing turns English "In" and "TWIST" into "ın" and "twıst"
+_DOTLESS_I = str.maketrans('ı', 'i')
+
+
+def match_form(text):
+    return lower(text).translate(_DOTLESS_I)
+
+
+def term_entry(term):
+    """(text, whole_word) for a lexicon term: a string, or {"term": ..., "whole_word": true}.
+
+    Plain strings may run on into a suffix, which suits Turkish stems
+    ("ölür" in "ölürken"). English terms are marked whole_word so "dies"
+    does not match "Diesel".
+    """
+    if isinstance(term, dict):
+        return term.get('term', ''), bool(term.get('whole_word'))
+    return term, False
+
+
+class Automaton:
+    """Aho-Corasick automaton: finds every term in one pass over the text."""
+
+    def __init__(self, terms):
+        self.goto = [{}]
+        self.fail = [0]
+        # Length of the longest term ending at each state, suffix-tolerant
+        # and whole-word terms kept apart
+        self.output = [0]
+        self.word_output = [0]
+        for term in terms:
+            text, whole_word = term_entry(term)
+            text = match_form(text).strip()
+            if text:
+                self._add(text, whole_word)
+        self._link()
+
+    def __len__(self):
+        return len(self.goto)
+
+    def _add(self, term, whole_word=False):
+        state = 0
+        for char in term:
+            following = self.goto[state].get(char)
+            if following is None:
+                following = len(self.goto)
+                self.goto[state][char] = following
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(0)
+                self.word_output.append(0)
+            state = following
+        # Keep the longest term ending here; a match only needs its length
+        outputs = self.word_output if whole_word else self.output
+        outputs[state] = max(outputs[state], len(term))
+
+    def _link(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, following in self.goto[state].items():
+                queue.append(following)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[following] = self.goto[fallback].get(char, 0)
+                # Inherit matches that end at the fallback state
+                self.output[following] = max(self.output[following], self.output[self.fail[following]])
+                self.word_output[following] = max(self.word_output[following], self.word_output[self.fail[following]])
+
+    def search(self, text):
+        """Return True if a term starts at a word boundary anywhere in text.
+
+        Suffix-tolerant terms may end mid-word so Turkish suffixes still
+        count: "ölür" also matches "ölürken". Whole-word terms must also end
+        at a word boundary.
+        """
+        goto, fail, output, word_output = self.goto, self.fail, self.output, self.word_output
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state] or word_output[state]:
+                ends_word = position + 1 == len(text) or not text[position + 1].isalnum()
+                # Walk the fail chain for a match that starts a word
+                match_state = state
+                while match_state:
+                    for length in (output[match_state], word_output[match_state] if ends_word else 0):
+                        if length:
+                            start = position - length + 1
+                            if start == 0 or not text[start - 1].isalnum():
+                                return True
+                    match_state = fail[match_state]
+        return False
+
+
+class SpoilerLexicon:
+    """Global and per-title spoiler terms, each compiled to one automaton."""
+
+    def __init__(self, global_terms=(), title_terms=None):
+        self.global_automaton = Automaton(global_terms)
+        self.title_terms = title_terms or {}
+        self._title_automaton = lru_cache(maxsize=1024)(self._build_title_automaton)
+
+    @classmethod
+    def load(cls, path):
+        if not os.path.exists(path):
+            return cls()
+        with open(path, encoding='utf-8') as data:
+            lexicon = json.load(data)
+        return cls(lexicon.get('global', []), lexicon.get('titles', {}))
+
+    def _build_title_automaton(self, title_key):
+        terms = self.title_terms.get(title_key)
+        return Automaton(terms) if terms else None
+
+    def is_spoiler(self, sentence, media_type=None, tmdb_id=None):
+        text = match_form(sentence)
+        if self.global_automaton.search(text):
+            return True
+        automaton = self._title_automaton(f'{media_type}:{tmdb_id}')
+        return automaton is not None and automaton.search(text)
+
+    def safe_sentences(self, text, media_type=None, tmdb_id=None):
+        for sentence in iter_sentences(text):
+            if not self.is_spoiler(sentence, media_type, tmdb_id):
+                yield sentence
+
+    def scrub(self, text, media_type=None, tmdb_id=None, limit=None):
+        """Return the first `limit` sentences of text that contain no spoiler term."""
+        return ' '.join(islice(self.safe_sentences(text, media_type, tmdb_id), limit))
+
+    def scrub_batch(self, items, limit=None):
+        """Scrub many (text, media_type, tmdb_id) overviews, e.g. for cache warmers."""
+        return [self.scrub(text or '', media_type, tmdb_id, limit) for text, media_type, tmdb_id in items]
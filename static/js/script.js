@@ -18,13 +18,7 @@ document.addEventListener('DOMContentLoaded', () => {
                 resultContainer.classList.add('hidden');
                 loadingSpinner.classList.remove('hidden');
 
-                const response = await fetch('/search', {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json',
-                    },
-                    body: JSON.stringify({ query }),
-                });
+                const response = await fetch(`/search?query=${encodeURIComponent(query)}`);
 
                 if (response.ok) {
                     const data = await response.json();
@@ -59,7 +53,7 @@ document.addEventListener('DOMContentLoaded', () => {
                     <div class="p-8">
                         <div class="uppercase tracking-wide text-sm text-accent font-semibold">${type}</div>
                         <h2 class="mt-1 text-2xl font-bold text-white leading-tight">${title}</h2>
-                        <p class="mt-2 text-gray-300 italic">"${tagline}"</p>
+                        <p id="result-tagline" data-id="${data.id}" class="mt-2 text-gray-300 italic">"${tagline}"</p>
                         <p class="mt-2 text-gray-300">${overview}</p>
                         <div class="mt-4">
                             <span class="text-accent font-bold">Puan:</span>
@@ -83,6 +77,27 @@ document.addEventListener('DOMContentLoaded', () => {
         resultContainer.firstElementChild.classList.remove('opacity-0', 'translate-y-4');
 
         document.getElementById('more-details-btn').addEventListener('click', fetchMoreDetails);
+
+        if (data.tagline === undefined && data.media_type === 'movie') {
+            loadTagline(data.id, data.media_type);
+        }
+    }
+
+    // /search no longer makes a detail call, so movie taglines are filled in
+    // from /details after the result is shown.
+    async function loadTagline(id, mediaType) {
+        try {
+            const response = await fetch(`/details/${id}?media_type=${mediaType}`);
+            if (response.ok) {
+                const details = await response.json();
+                const taglineElement = document.getElementById('result-tagline');
+                if (taglineElement && taglineElement.dataset.id === String(id) && details.tagline) {
+                    taglineElement.textContent = `"${details.tagline}"`;
+                }
+            }
+        } catch (error) {
+            console.error('Error fetching tagline:', error);
+        }
     }
 
     async function fetchMoreDetails(e) {
@@ -0,0 +1,227 @@
+"""Local stand-in for the TMDB API, served from fixtures.
+
+Serves /3/search/multi, /3/movie/<id>, /3/tv/<id> and /3/genre/<type>/list
+from fixtures/tmdb, with configurable latency and error injection, so the
+app can be load-tested without network access or API quota:
+
+    python stub_tmdb.py serve --port 8010 --latency lognormal:3.9:0.4 --error-rate 0.01
+    TMDB_BASE_URL=http://127.0.0.1:8010/3 python main.py
+
+The bundled detail fixtures are synthetic: hand-written tr-TR documents
+with the field set and size of TMDB detail responses without
+append_to_response (about 2-3 KB per movie, 4-8 KB per show with its
+seasons). Ids other than the TMDB and IMDb ids, image paths and credit
+ids are placeholders. They can be replaced with real responses:
+
+    TMDB_API_KEY=... python stub_tmdb.py record movie:27205 tv:1399 --search Inception
+"""
+import argparse
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from normalize import fold
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'tmdb')
+
+_DETAIL_PATH = re.compile(r'^/3/(movie|tv)/(\d+)$')
+_GENRE_PATH = re.compile(r'^/3/genre/(movie|tv)/list$')
+# Detail fields that also appear on /search/multi hits
+_HIT_FIELDS = (
+    'adult', 'backdrop_path', 'id', 'title', 'name', 'original_title', 'original_name', 'overview',
+    'poster_path', 'original_language', 'popularity', 'release_date', 'first_air_date',
+    'vote_average', 'vote_count', 'origin_country',
+)
+
+
+def parse_latency(spec):
+    """Return a function giving a delay in seconds for a latency spec in ms.
+
+    "fixed:50", "uniform:20:80" or "lognormal:MU:SIGMA" (MU and SIGMA of
+    ln(ms), so "lognormal:3.9:0.4" has a median of about 50 ms).
+    """
+    kind, _, args = (spec or 'fixed:0').partition(':')
+    values = [float(value) for value in args.split(':') if value]
+    if kind == 'fixed':
+        return lambda rng: values[0] / 1000
+    if kind == 'uniform':
+        return lambda rng: rng.uniform(values[0], values[1]) / 1000
+    if kind == 'lognormal':
+        return lambda rng: math.exp(rng.gauss(values[0], values[1])) / 1000
+    raise ValueError(f'Unknown latency distribution: {spec}')
+
+
+class Catalogue:
+    def __init__(self, fixtures_dir=FIXTURES_DIR):
+        self.fixtures_dir = fixtures_dir
+        self.details = {}
+        for media_type in ('movie', 'tv'):
+            directory = os.path.join(fixtures_dir, media_type)
+            for name in sorted(os.listdir(directory)) if os.path.isdir(directory) else ():
+                if name.endswith('.json'):
+                    with open(os.path.join(directory, name), encoding='utf-8') as record:
+                        self.details[(media_type, int(name[:-5]))] = json.load(record)
+        self.genres = {}
+        for media_type in ('movie', 'tv'):
+            path = os.path.join(fixtures_dir, 'genre', f'{media_type}.json')
+            if os.path.exists(path):
+                with open(path, encoding='utf-8') as record:
+                    self.genres[media_type] = json.load(record)
+        self.hits = sorted(
+            (self._hit(media_type, detail) for (media_type, _), detail in self.details.items()),
+            key=lambda hit: -hit.get('popularity', 0)
+        )
+
+    @staticmethod
+    def _hit(media_type, detail):
+        hit = {field: detail[field] for field in _HIT_FIELDS if field in detail}
+        hit['media_type'] = media_type
+        hit['genre_ids'] = [genre['id'] for genre in detail.get('genres', [])]
+        hit['_keys'] = {fold(detail.get(field) or '') for field in ('title', 'name', 'original_title', 'original_name')}
+        return hit
+
+    def search(self, query):
+        recorded = os.path.join(self.fixtures_dir, 'search', f'{fold(query)}.json')
+        if os.path.exists(recorded):
+            with open(recorded, encoding='utf-8') as record:
+                return json.load(record)
+        key = fold(query)
+        results = [
+            {field: value for field, value in hit.items() if field != '_keys'}
+            for hit in self.hits
+            if key and any(key in title for title in hit['_keys'])
+        ]
+        return {'page': 1, 'results': results, 'total_pages': 1, 'total_results': len(results)}
+
+
+def make_server(host='127.0.0.1', port=0, fixtures_dir=FIXTURES_DIR, latency='fixed:0',
+                error_rate=0.0, error_status=500, seed=None):
+    catalogue = Catalogue(fixtures_dir)
+    delay = parse_latency(latency)
+    rng = random.Random(seed)
+    rng_lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def _send(self, status, body, headers=()):
+            payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json;charset=utf-8')
+            self.send_header('Content-Length', str(len(payload)))
+            for name, value in headers:
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            with rng_lock:
+                wait = delay(rng)
+                failed = rng.random() < error_rate
+                self.server.request_count += 1
+            time.sleep(max(0.0, wait))
+            if failed:
+                headers = [('Retry-After', '1')] if error_status == 429 else []
+                self._send(error_status, {'status_code': 11, 'status_message': 'Injected error.'}, headers)
+                return
+
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            if url.path == '/3/search/multi':
+                self._send(200, catalogue.search(query.get('query', [''])[0]))
+                return
+            match = _DETAIL_PATH.match(url.path)
+            if match:
+                detail = catalogue.details.get((match.group(1), int(match.group(2))))
+                if detail is not None:
+                    self._send(200, detail)
+                    return
+            match = _GENRE_PATH.match(url.path)
+            if match and match.group(1) in catalogue.genres:
+                self._send(200, catalogue.genres[match.group(1)])
+                return
+            self._send(404, {'status_code': 34, 'status_message': 'The resource you requested could not be found.'})
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    server.request_count = 0
+    server.base_url = f'http://{host}:{server.server_port}/3'
+    return server
+
+
+def start_in_thread(**options):
+    server = make_server(**options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def record(targets, searches, fixtures_dir=FIXTURES_DIR, language='tr-TR'):
+    import requests
+
+    api_key = os.environ['TMDB_API_KEY']
+    base_url = 'https://api.themoviedb.org/3'
+
+    def save(path, body):
+        path = os.path.join(fixtures_dir, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as output:
+            json.dump(body, output, ensure_ascii=False, indent=2)
+            output.write('\n')
+        print(f'Recorded {path}')
+
+    def fetch(path, **params):
+        response = requests.get(f'{base_url}{path}', params={'api_key': api_key, 'language': language, **params}, timeout=10)
+        response.raise_for_status()
+        return response.json()
+
+    for media_type in ('movie', 'tv'):
+        save(f'genre/{media_type}.json', fetch(f'/genre/{media_type}/list'))
+    for target in targets:
+        media_type, _, tmdb_id = target.partition(':')
+        save(f'{media_type}/{int(tmdb_id)}.json', fetch(f'/{media_type}/{int(tmdb_id)}'))
+    for query in searches:
+        save(f'search/{fold(query)}.json', fetch('/search/multi', query=query))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve = commands.add_parser('serve', help='serve the fixtures')
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8010)
+    serve.add_argument('--fixtures', default=FIXTURES_DIR)
+    serve.add_argument('--latency', default='fixed:0', help='fixed:MS, uniform:MIN:MAX or lognormal:MU:SIGMA')
+    serve.add_argument('--error-rate', type=float, default=0.0)
+    serve.add_argument('--error-status', type=int, default=500)
+    serve.add_argument('--seed', type=int)
+
+    recorder = commands.add_parser('record', help='record fixtures from the real API (needs TMDB_API_KEY)')
+    recorder.add_argument('targets', nargs='*', help='media_type:id, e.g. movie:27205')
+    recorder.add_argument('--search', action='append', default=[])
+    recorder.add_argument('--fixtures', default=FIXTURES_DIR)
+
+    args = parser.parse_args()
+    if args.command == 'record':
+        record(args.targets, args.search, args.fixtures)
+        return
+    server = make_server(args.host, args.port, args.fixtures, args.latency, args.error_rate, args.error_status, args.seed)
+    print(f'Stub TMDB serving {args.fixtures} at {server.base_url}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
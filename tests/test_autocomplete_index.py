@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+
+import autocomplete_index
+
+EXPORTS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'fixtures', 'tmdb_exports')
+MOVIES = os.path.join(EXPORTS, 'movie_ids_sample.json.gz')
+SHOWS = os.path.join(EXPORTS, 'tv_series_ids_sample.json.gz')
+
+
+class PrefixIndexTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.index = autocomplete_index.build([MOVIES, SHOWS])
+
+    def test_builds_from_both_exports_without_adult_titles(self):
+        titles = set(self.index.titles)
+        self.assertIn('Inception', titles)
+        self.assertIn('Game of Thrones', titles)
+        self.assertNotIn('Adult Title', titles)
+        self.assertEqual(len(self.index), 54)
+
+    def test_min_popularity(self):
+        index = autocomplete_index.build([MOVIES, SHOWS], min_popularity=100.0)
+        self.assertTrue(all(popularity >= 100.0 for popularity in index.popularity))
+        self.assertIn('Interstellar', index.titles)
+        self.assertNotIn('Inception', index.titles)
+
+    def test_short_prefix_ranked_by_popularity(self):
+        self.assertEqual(self.index.suggest('b'), ['Breaking Bad', 'Better Call Saul', 'Black Mirror', 'Babam ve Oğlum'])
+        self.assertEqual(self.index.suggest('the')[:2], ['The Last of Us', 'The Walking Dead'])
+
+    def test_long_prefix(self):
+        self.assertEqual(self.index.suggest('the matrix re'),
+                         ['The Matrix Resurrections', 'The Matrix Reloaded', 'The Matrix Revolutions'])
+        self.assertEqual(self.index.suggest('the matrix re', limit=1), ['The Matrix Resurrections'])
+
+    def test_query_is_folded(self):
+        self.assertEqual(self.index.suggest('İNC'), ['Inception'])
+        self.assertEqual(self.index.suggest('eski'), ['Eşkıya'])
+        self.assertEqual(self.index.suggest('dirilis er'), ['Diriliş: Ertuğrul'])
+
+    def test_no_match(self):
+        self.assertEqual(self.index.suggest('zzz'), [])
+        self.assertEqual(self.index.suggest('!!'), [])
+
+    def test_precomputed_and_ranked_prefixes_agree(self):
+        for prefix in ('t', 'th', 'the', 'b', 'go'):
+            with self.subTest(prefix=prefix):
+                self.assertEqual(list(self.index.short_prefixes[prefix]), self.index._rank(*self.index._range(prefix)))
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'index.json.gz')
+            self.index.save(path)
+            loaded = autocomplete_index.PrefixIndex.load(path)
+        self.assertEqual(loaded.titles, self.index.titles)
+        for query in ('the', 'the matrix', 'g', 'oyun'):
+            with self.subTest(query=query):
+                self.assertEqual(loaded.suggest(query), self.index.suggest(query))
+
+
+if __name__ == '__main__':
+    unittest.main()
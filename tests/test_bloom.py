@@ -0,0 +1,79 @@
+import unittest
+
+from bloom import BloomFilter, RotatingBloomFilter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def items(start, stop):
+    return [f'query {number}'.encode() for number in range(start, stop)]
+
+
+class BloomFilterTest(unittest.TestCase):
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(1000, 0.001)
+        for item in items(0, 1000):
+            bloom.add(item)
+        self.assertTrue(all(item in bloom for item in items(0, 1000)))
+        self.assertEqual(bloom.count, 1000)
+
+    def test_false_positive_rate_at_capacity(self):
+        bloom = BloomFilter(1000, 0.01)
+        for item in items(0, 1000):
+            bloom.add(item)
+        false_positives = sum(item in bloom for item in items(1000, 21000)) / 20000
+        self.assertLess(false_positives, 0.02)
+        self.assertLess(bloom.false_positive_rate(), 0.02)
+
+    def test_empty(self):
+        bloom = BloomFilter(100, 0.01)
+        self.assertNotIn(b'anything', bloom)
+        self.assertEqual(bloom.false_positive_rate(), 0)
+
+
+class RotatingBloomFilterTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.bloom = RotatingBloomFilter(100, 0.001, 10, self.clock)
+
+    def test_items_live_between_ttl_and_two_ttl(self):
+        self.bloom.add(b'nothing')
+        self.clock.now += 15
+        self.assertIn(b'nothing', self.bloom)
+        self.clock.now += 10
+        self.assertNotIn(b'nothing', self.bloom)
+        self.assertEqual(self.bloom.rotations, 2)
+
+    def test_rotates_at_capacity(self):
+        for item in items(0, 100):
+            self.bloom.add(item)
+        self.bloom.add(b'one more')
+        self.assertEqual(self.bloom.rotations, 1)
+        self.assertIn(items(0, 1)[0], self.bloom)
+        for item in items(100, 200):
+            self.bloom.add(item)
+        self.assertEqual(self.bloom.rotations, 2)
+        self.assertNotIn(items(0, 1)[0], self.bloom)
+
+    def test_idle_filter_forgets_both_generations(self):
+        self.bloom.add(b'nothing')
+        self.clock.now += 20
+        self.assertNotIn(b'nothing', self.bloom)
+        self.assertEqual(self.bloom.stats()['entries'], 0)
+
+    def test_stats(self):
+        self.bloom.add(b'nothing')
+        stats = self.bloom.stats()
+        self.assertEqual(stats['entries'], 1)
+        self.assertEqual(stats['bytes'], 2 * len(self.bloom.current.bits))
+        self.assertEqual(stats['rotations'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
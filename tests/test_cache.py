@@ -0,0 +1,224 @@
+import asyncio
+import logging
+import threading
+import unittest
+from unittest import mock
+
+import cache
+from cache import Policy, ResponseCache, cached, cached_async
+from singleflight import SingleFlight
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class InlineExecutor:
+    # Runs background refreshes on their own thread, as the pool does, but
+    # before submit() returns
+    def submit(self, function):
+        thread = threading.Thread(target=function)
+        thread.start()
+        thread.join()
+
+
+class Loader:
+    """Upstream stand-in: returns or raises the queued answers in order, then repeats the last."""
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.calls = 0
+
+    def __call__(self, *args):
+        self.calls += 1
+        answer = self.answers.pop(0) if len(self.answers) > 1 else self.answers[0]
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+
+TTL, STALE_WHILE_REVALIDATE, STALE_IF_ERROR, NEGATIVE_TTL = 10, 20, 100, 60
+
+
+class CacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = ResponseCache({
+            'details': Policy(TTL, 100, 10 ** 6, stale_while_revalidate=STALE_WHILE_REVALIDATE,
+                              stale_if_error=STALE_IF_ERROR),
+            'search': Policy(TTL, 100, 10 ** 6, negative_ttl=NEGATIVE_TTL, negative_capacity=1000),
+        }, clock=self.clock)
+        flights = {'details': SingleFlight(), 'search': SingleFlight()}
+        for target, value in (('response_cache', self.cache), ('flights', flights),
+                              ('_refresh_pool', InlineExecutor())):
+            patcher = mock.patch.object(cache, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        logging.disable(logging.WARNING)
+        self.addCleanup(logging.disable, logging.NOTSET)
+
+    def stats(self, endpoint='details'):
+        return self.cache.stats()[endpoint]
+
+
+class CachedTest(CacheTestCase):
+    def test_fresh_entries_are_served_from_memory(self):
+        loader = Loader({'id': 1})
+        fetch = cached('details')(loader)
+        self.assertEqual(fetch('movie', 1), {'id': 1})
+        self.clock.now += TTL - 1
+        self.assertEqual(fetch('movie', 1), {'id': 1})
+        self.assertEqual(loader.calls, 1)
+        self.assertEqual(self.stats()['hits'], 1)
+
+    def test_none_is_not_cached(self):
+        loader = Loader(None, {'id': 1})
+        fetch = cached('details')(loader)
+        self.assertIsNone(fetch('movie', 1))
+        self.assertEqual(fetch('movie', 1), {'id': 1})
+        self.assertEqual(loader.calls, 2)
+
+    def test_revalidate_serves_stale_and_refreshes(self):
+        loader = Loader({'v': 1}, {'v': 2})
+        fetch = cached('details')(loader)
+        fetch('movie', 1)
+        self.clock.now += TTL + 1
+        self.assertEqual(fetch('movie', 1), {'v': 1})
+        self.assertEqual(loader.calls, 2)
+        self.assertEqual(fetch('movie', 1), {'v': 2})
+        self.assertEqual(self.stats()['stale_hits'], 1)
+        self.assertEqual(self.stats()['refreshes'], 1)
+
+    def test_failed_background_refresh_keeps_the_entry(self):
+        loader = Loader({'v': 1}, RuntimeError('upstream'))
+        fetch = cached('details')(loader)
+        fetch('movie', 1)
+        self.clock.now += TTL + 1
+        self.assertEqual(fetch('movie', 1), {'v': 1})
+        self.assertEqual(fetch('movie', 1), {'v': 1})
+        self.assertEqual(self.cache.refreshing, set())
+
+    def test_stale_if_error(self):
+        for failure in (RuntimeError('upstream'), None):
+            with self.subTest(failure=failure):
+                self.cache.clear()
+                loader = Loader({'v': 1}, failure, {'v': 2})
+                fetch = cached('details')(loader)
+                fetch('movie', 1)
+                self.clock.now += TTL + STALE_WHILE_REVALIDATE + 1
+                self.assertEqual(fetch('movie', 1), {'v': 1})
+                self.assertEqual(self.stats()['stale_if_error_hits'], 1)
+                # Still in the stale-if-error window: the next call refreshes again
+                self.assertEqual(fetch('movie', 1), {'v': 2})
+                self.assertEqual(loader.calls, 3)
+
+    def test_entries_are_dropped_after_stale_if_error(self):
+        loader = Loader({'v': 1}, RuntimeError('upstream'))
+        fetch = cached('details')(loader)
+        fetch('movie', 1)
+        self.clock.now += TTL + STALE_IF_ERROR + 1
+        with self.assertRaises(RuntimeError):
+            fetch('movie', 1)
+        self.assertEqual(self.stats()['expirations'], 1)
+        self.assertIsNone(fetch.etag('movie', 1))
+
+    def test_is_cached_covers_the_revalidate_window(self):
+        fetch = cached('details')(Loader({'v': 1}))
+        self.assertFalse(fetch.is_cached('movie', 1))
+        fetch('movie', 1)
+        self.clock.now += TTL + STALE_WHILE_REVALIDATE - 1
+        self.assertTrue(fetch.is_cached('movie', 1))
+        self.clock.now += 2
+        self.assertFalse(fetch.is_cached('movie', 1))
+
+    def test_keys_are_normalized(self):
+        loader = Loader({'v': 1})
+        fetch = cached('details')(loader)
+        fetch('İnception')
+        fetch('  inception ')
+        self.assertEqual(loader.calls, 1)
+
+
+class NegativeCacheTest(CacheTestCase):
+    def verify_rate(self, rate):
+        patcher = mock.patch.object(cache, 'NEGATIVE_VERIFY_RATE', rate)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_empty_results_go_to_the_filter(self):
+        self.verify_rate(0)
+        loader = Loader({})
+        search = cached('search', empty=dict)(loader)
+        self.assertEqual(search('xyzzy'), {})
+        self.assertEqual(search('xyzzy'), {})
+        self.assertEqual(loader.calls, 1)
+        self.assertEqual(self.stats('search')['negative_hits'], 1)
+        self.assertEqual(self.stats('search')['entries'], 0)
+
+    def test_negative_hits_are_rechecked(self):
+        self.verify_rate(1)
+        loader = Loader({}, {'results': [1]})
+        search = cached('search', empty=dict)(loader)
+        search('xyzzy')
+        self.assertEqual(search('xyzzy'), {'results': [1]})
+        self.assertEqual(loader.calls, 2)
+        stats = self.stats('search')
+        self.assertEqual(stats['negative_checks'], 1)
+        self.assertEqual(stats['negative_false_positives'], 1)
+        # The real result is cached and now shadows the filter
+        self.assertEqual(search('xyzzy'), {'results': [1]})
+        self.assertEqual(loader.calls, 2)
+
+    def test_filter_forgets_after_negative_ttl(self):
+        self.verify_rate(0)
+        loader = Loader({}, {'results': [1]})
+        search = cached('search', empty=dict)(loader)
+        search('xyzzy')
+        # Keys are kept for at least negative_ttl / 2
+        self.clock.now += NEGATIVE_TTL / 2 - 1
+        self.assertEqual(search('xyzzy'), {})
+        self.clock.now += NEGATIVE_TTL / 2 + 1
+        self.assertEqual(search('xyzzy'), {'results': [1]})
+        self.assertEqual(loader.calls, 2)
+
+    def test_without_empty_falsy_results_are_cached(self):
+        loader = Loader([])
+        search = cached('search')(loader)
+        search('xyzzy')
+        search('xyzzy')
+        self.assertEqual(loader.calls, 1)
+        self.assertEqual(self.stats('search')['negative_entries'], 0)
+
+
+class CachedAsyncTest(CacheTestCase):
+    def wrap(self, loader):
+        async def load(*args):
+            return loader(*args)
+        return cached_async('details')(load)
+
+    def test_fresh_and_stale_if_error(self):
+        loader = Loader({'v': 1}, RuntimeError('upstream'), {'v': 2})
+        fetch = self.wrap(loader)
+        self.assertEqual(asyncio.run(fetch('movie', 1)), {'v': 1})
+        self.assertEqual(asyncio.run(fetch('movie', 1)), {'v': 1})
+        self.assertEqual(loader.calls, 1)
+        self.clock.now += TTL + STALE_WHILE_REVALIDATE + 1
+        self.assertEqual(asyncio.run(fetch('movie', 1)), {'v': 1})
+        self.assertEqual(asyncio.run(fetch('movie', 1)), {'v': 2})
+        self.assertEqual(self.stats()['stale_if_error_hits'], 1)
+
+    def test_revalidate_refreshes_in_the_background(self):
+        loader = Loader({'v': 1}, {'v': 2})
+        fetch = self.wrap(loader)
+        asyncio.run(fetch('movie', 1))
+        self.clock.now += TTL + 1
+        self.assertEqual(asyncio.run(fetch('movie', 1)), {'v': 1})
+        self.assertEqual(asyncio.run(fetch('movie', 1)), {'v': 2})
+
+
+if __name__ == '__main__':
+    unittest.main()
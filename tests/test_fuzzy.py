@@ -0,0 +1,55 @@
+import threading
+import unittest
+
+from fuzzy import TitleMatcher, numbers
+
+
+class TitleMatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.matcher = TitleMatcher()
+        for title in ('Toy Story 2', 'Scream 2', 'Rocky II', 'The Godfather Part II', 'Inception', 'Interstellar'):
+            self.matcher.add(title)
+
+    def test_corrects_typos(self):
+        self.assertEqual(self.matcher.match('Inceptoin'), ('Inception', 2))
+        self.assertEqual(self.matcher.match('intersteller'), ('Interstellar', 1))
+        self.assertEqual(self.matcher.match('Toy Stroy 2'), ('Toy Story 2', 2))
+        self.assertEqual(self.matcher.match('The Godfater Part II'), ('The Godfather Part II', 1))
+
+    def test_exact_match(self):
+        self.assertEqual(self.matcher.match('İNCEPTİON'), ('Inception', 0))
+
+    def test_never_changes_sequel_numbers(self):
+        for query in ('Toy Story 3', 'Toy Story 4', 'Scream 3', 'Rocky IV', 'Rocky I', 'The Godfather Part III'):
+            with self.subTest(query=query):
+                self.assertIsNone(self.matcher.match(query))
+                self.assertIsNone(self.matcher.match(query, loose=True))
+
+    def test_byte_budget(self):
+        matcher = TitleMatcher(max_bytes=3000)
+        for number in range(100):
+            matcher.add(f'Title {number:03d}')
+        self.assertLess(len(matcher), 100)
+        self.assertLessEqual(matcher.memory_bytes(), 3000)
+        self.assertEqual(matcher.match('Title 000'), ('Title 000', 0))
+
+    def test_load_in_background(self):
+        matcher = TitleMatcher()
+        matcher.load_in_background(lambda: [('Arrival', 10.0), ('Dune', 50.0)])
+        matcher.load_in_background(lambda: [('Ignored', 1.0)])
+        for thread in threading.enumerate():
+            if thread.name == 'title-index':
+                thread.join()
+        self.assertEqual(len(matcher), 2)
+        self.assertEqual(matcher.match('Arival'), ('Arrival', 1))
+
+    def test_numbers(self):
+        self.assertEqual(numbers('rocky iv'), ['iv'])
+        self.assertEqual(numbers('star wars episode iv a new hope'), ['iv'])
+        self.assertEqual(numbers('se7en 2'), ['7', '2'])
+        self.assertEqual(numbers('civil war'), [])
+        self.assertEqual(numbers('mix vivid'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
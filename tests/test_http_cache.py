@@ -0,0 +1,100 @@
+import gzip
+import json
+import unittest
+
+from flask import Flask
+
+import compression
+import http_cache
+from http_cache import compress_response, etag, json_response, uncached_error
+
+PAYLOAD = {'results': [{'id': number, 'title': f'Movie {number}'} for number in range(100)]}
+VALIDATOR = etag('details', 'movie', 1)
+GZIP_VALIDATOR = VALIDATOR[:-1] + '-gzip"'
+
+
+class HttpCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.after_request(compress_response)
+        self.encoded_calls = []
+
+        @self.app.route('/details')
+        def details():
+            return json_response('details', PAYLOAD, VALIDATOR)
+
+        @self.app.route('/details/encoded')
+        def details_encoded():
+            return json_response('details', PAYLOAD, VALIDATOR, encoded=self.encoded)
+
+        @self.app.route('/error')
+        def error():
+            return uncached_error('TMDB is unavailable', 502)
+
+        self.client = self.app.test_client()
+
+    def encoded(self, encoding):
+        self.encoded_calls.append(encoding)
+        return compression.compress(json.dumps(PAYLOAD).encode(), encoding)
+
+    def test_caching_headers(self):
+        response = self.client.get('/details')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['Cache-Control'], http_cache.CACHE_CONTROL['details'])
+        self.assertEqual(response.headers['ETag'], VALIDATOR)
+        self.assertEqual(response.headers['Vary'], 'Accept-Encoding')
+        self.assertEqual(response.get_json(), PAYLOAD)
+
+    def test_not_modified(self):
+        response = self.client.get('/details', headers={'If-None-Match': VALIDATOR})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers['ETag'], VALIDATOR)
+        self.assertEqual(response.headers['Cache-Control'], http_cache.CACHE_CONTROL['details'])
+        self.assertEqual(response.data, b'')
+
+    def test_not_modified_for_the_gzip_variant(self):
+        headers = {'If-None-Match': GZIP_VALIDATOR, 'Accept-Encoding': 'gzip'}
+        response = self.client.get('/details', headers=headers)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers['ETag'], GZIP_VALIDATOR)
+        self.assertNotIn('Content-Encoding', response.headers)
+
+    def test_gzip_variant_needs_gzip(self):
+        response = self.client.get('/details', headers={'If-None-Match': GZIP_VALIDATOR})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['ETag'], VALIDATOR)
+
+    def test_stale_validator(self):
+        response = self.client.get('/details', headers={'If-None-Match': etag('details', 'movie', 2)})
+        self.assertEqual(response.status_code, 200)
+
+    def test_compresses_json(self):
+        response = self.client.get('/details', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(response.headers['ETag'], GZIP_VALIDATOR)
+        self.assertEqual(json.loads(gzip.decompress(response.data)), PAYLOAD)
+
+    def test_precompressed_body(self):
+        response = self.client.get('/details/encoded', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(self.encoded_calls, ['gzip'])
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(response.headers['ETag'], GZIP_VALIDATOR)
+        self.assertEqual(response.mimetype, 'application/json')
+        self.assertEqual(json.loads(gzip.decompress(response.data)), PAYLOAD)
+
+    def test_precompressed_body_only_when_accepted(self):
+        response = self.client.get('/details/encoded')
+        self.assertEqual(self.encoded_calls, [])
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertEqual(response.get_json(), PAYLOAD)
+
+    def test_errors_are_not_stored(self):
+        response = self.client.get('/error', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.status_code, 502)
+        self.assertEqual(response.headers['Cache-Control'], 'no-store')
+        self.assertNotIn('ETag', response.headers)
+        self.assertEqual(response.get_json(), {'error': 'TMDB is unavailable'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+
+from normalize import fold
+
+# (input, expected key)
+CORPUS = [
+    ('İnception', 'inception'),
+    ('inception', 'inception'),
+    ('ınception', 'inception'),
+    ('INCEPTION', 'inception'),
+    ('  The   Matrix!! ', 'the matrix'),
+    ('Eşkıya', 'eskiya'),
+    ('ESKİYA', 'eskiya'),
+    ('Diriliş: Ertuğrul', 'dirilis ertugrul'),
+    ('Muhteşem Yüzyıl', 'muhtesem yuzyil'),
+    ('Çağan Irmak', 'cagan irmak'),
+    ('ŞAHSİYET', 'sahsiyet'),
+    ('Babam ve Oğlum', 'babam ve oglum'),
+    ("Schindler's List", 'schindlers list'),
+    ('Ocean’s Eleven', 'oceans eleven'),
+    ('G.O.R.A.', 'gora'),
+    ('Mr. Robot', 'mr robot'),
+    ('Léon: The Professional', 'leon the professional'),
+    ('Amélie', 'amelie'),
+    ('Straße', 'strasse'),
+    ('ﬁlm', 'film'),
+    ('Spider-Man: No Way Home', 'spider man no way home'),
+    ('Se7en', 'se7en'),
+    ('La casa de papel\t', 'la casa de papel'),
+    ('Star Wars: Episode IV – A New Hope', 'star wars episode iv a new hope'),
+    ('ドラゴンボール', 'ドラゴンボール'),
+    ('오징어 게임', '오징어 게임'),
+    ('君の名は。', '君の名は'),
+    ('!!!', ''),
+    ('', ''),
+]
+
+
+class FoldTest(unittest.TestCase):
+    def test_corpus(self):
+        for text, expected in CORPUS:
+            with self.subTest(text=text):
+                self.assertEqual(fold(text), expected)
+
+    def test_idempotent(self):
+        for _, expected in CORPUS:
+            with self.subTest(key=expected):
+                self.assertEqual(fold(expected), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
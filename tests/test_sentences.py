@@ -0,0 +1,53 @@
+import unittest
+
+from sentences import first_sentences, first_sentences_batch, iter_sentences
+
+# (text, expected sentences)
+CORPUS = [
+    ('Bir. İki. Üç.', ['Bir.', 'İki.', 'Üç.']),
+    ('Dr. Cobb bir hırsız. Saito ona teklif yapar.', ['Dr. Cobb bir hırsız.', 'Saito ona teklif yapar.']),
+    ('Prof. Dr. Ahmet geri döner. Her şey değişir.', ['Prof. Dr. Ahmet geri döner.', 'Her şey değişir.']),
+    ("Kraliçe II. Elizabeth'in hükümdarlığı. Tarihi bir drama.",
+     ["Kraliçe II. Elizabeth'in hükümdarlığı.", 'Tarihi bir drama.']),
+    ('20. yüzyılın olaylarına tanıklık eder. Duygu yüklü bir film.',
+     ['20. yüzyılın olaylarına tanıklık eder.', 'Duygu yüklü bir film.']),
+    ('Hikaye 2. Dünya Savaşı sırasında geçer. Bir asker eve döner.',
+     ['Hikaye 2. Dünya Savaşı sırasında geçer.', 'Bir asker eve döner.']),
+    ('3. Sezon finalinde ekip dağılır. 5. Bölüm bir geri dönüştür.',
+     ['3. Sezon finalinde ekip dağılır.', '5. Bölüm bir geri dönüştür.']),
+    ('Film 1999. Sonra devamı çekildi.', ['Film 1999.', 'Sonra devamı çekildi.']),
+    ('Gemi 3.5 milyon dolara satılır. Mürettebat isyan eder.',
+     ['Gemi 3.5 milyon dolara satılır.', 'Mürettebat isyan eder.']),
+    ('Kimse bilmiyor... Sonra her şey değişir.', ['Kimse bilmiyor...', 'Sonra her şey değişir.']),
+    ('Bekledi… ve bekledi. Sonunda geldi.', ['Bekledi… ve bekledi.', 'Sonunda geldi.']),
+    ('Kim o? Neden burada! Kimse bilmiyor.', ['Kim o?', 'Neden burada!', 'Kimse bilmiyor.']),
+    ('"Gitme!" dedi. Ama gitti.', ['"Gitme!" dedi.', 'Ama gitti.']),
+    ('"Gitme!" Ama gitti.', ['"Gitme!"', 'Ama gitti.']),
+    ('J. R. R. Tolkien uyarlaması. Orta Dünya.', ['J. R. R. Tolkien uyarlaması.', 'Orta Dünya.']),
+    ('Silahlar, zırhlar vb. toplanır. Savaş başlar.', ['Silahlar, zırhlar vb. toplanır.', 'Savaş başlar.']),
+    ('Mr. Robot geri döndü?! Elliot şaşkın.', ['Mr. Robot geri döndü?!', 'Elliot şaşkın.']),
+    ('Sonu noktasız biter', ['Sonu noktasız biter']),
+    ('  Boşluklu   metin.   Yine.  ', ['Boşluklu   metin.', 'Yine.']),
+    ('www.example.com adresinde. Devamı var.', ['www.example.com adresinde.', 'Devamı var.']),
+    ('', []),
+]
+
+
+class SentenceTest(unittest.TestCase):
+    def test_corpus(self):
+        for text, expected in CORPUS:
+            with self.subTest(text=text):
+                self.assertEqual(list(iter_sentences(text)), expected)
+
+    def test_first_sentences(self):
+        texts = [text for text, _ in CORPUS]
+        for count in (1, 2, 3):
+            batch = first_sentences_batch(texts, count)
+            for (text, expected), from_batch in zip(CORPUS, batch):
+                with self.subTest(text=text, count=count):
+                    self.assertEqual(first_sentences(text, count), ' '.join(expected[:count]))
+                    self.assertEqual(from_batch, ' '.join(expected[:count]))
+
+
+if __name__ == '__main__':
+    unittest.main()
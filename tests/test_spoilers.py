@@ -0,0 +1,43 @@
+import unittest
+
+from spoilers import SpoilerLexicon
+
+TERMS = ['ölür', 'hayatını kaybeder', 'meğer', {'term': 'dies', 'whole_word': True},
+         {'term': 'twist', 'whole_word': True}, {'term': 'turns out', 'whole_word': True},
+         {'term': 'in the end', 'whole_word': True}]
+
+
+class SpoilerLexiconTest(unittest.TestCase):
+    def setUp(self):
+        self.lexicon = SpoilerLexicon(TERMS, {'movie:27205': ['topaç']})
+
+    def test_turkish_terms_match_with_suffixes(self):
+        for sentence in ('Kahraman sonunda ölür.', 'Ölürken sırrını açıklar.', 'Finalde hayatını kaybederken gülümser.',
+                         'Meğerse her şey bir rüyaymış.', 'FİNALDE HAYATINI KAYBEDER.'):
+            with self.subTest(sentence=sentence):
+                self.assertTrue(self.lexicon.is_spoiler(sentence))
+
+    def test_terms_start_at_a_word_boundary(self):
+        self.assertFalse(self.lexicon.is_spoiler('Sonra gölüre bakar.'))
+
+    def test_whole_word_terms(self):
+        for sentence in ('The hero dies.', 'It turns out he was dead', 'A twist, at last.',
+                         'In the end, everyone changes.', "The film's TWIST is great.", 'IT TURNS OUT HE WAS DEAD'):
+            with self.subTest(sentence=sentence):
+                self.assertTrue(self.lexicon.is_spoiler(sentence))
+        for sentence in ('Vin Diesel bir sürücüyü oynuyor.', 'Twister bir fırtına filmi.', 'Studies of a city.',
+                         'It turns outward.', 'Winter in the endless north.'):
+            with self.subTest(sentence=sentence):
+                self.assertFalse(self.lexicon.is_spoiler(sentence))
+
+    def test_title_terms(self):
+        self.assertTrue(self.lexicon.is_spoiler('Topaç dönmeye devam eder.', 'movie', 27205))
+        self.assertFalse(self.lexicon.is_spoiler('Topaç dönmeye devam eder.', 'movie', 155))
+
+    def test_scrub(self):
+        text = 'Vin Diesel bir sürücüyü oynuyor. Sonunda ölür. Twister bir fırtına filmi.'
+        self.assertEqual(self.lexicon.scrub(text), 'Vin Diesel bir sürücüyü oynuyor. Twister bir fırtına filmi.')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+import asyncio
+import os
+
+import requests
+
+import tmdb_client
+
+# Deadline for one upstream call on the async path, connect through body
+DEADLINE = float(os.environ.get('TMDB_ASYNC_DEADLINE', '4'))
+
+
+# What a failed or late call raises
+ERRORS = (asyncio.TimeoutError, requests.RequestException)
+
+
+async def get(url, params=None, deadline=DEADLINE):
+    """Fetch a TMDB URL without blocking the event loop.
+
+    The request runs on the pooled keep-alive session in a worker thread, so
+    the async and sync paths share connections and timing stats. Raises one
+    of ERRORS if the call failed or missed its deadline.
+    """
+    return await asyncio.wait_for(asyncio.to_thread(tmdb_client.get, url, params), deadline)
+
+
+async def get_json(url, params=None, deadline=DEADLINE):
+    # None only when TMDB answered 404; see tmdb_client.json_body
+    return tmdb_client.json_body(await get(url, params, deadline))
@@ -0,0 +1,119 @@
+import os
+import re
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import json_codec
+import metrics
+
+# One pooled, keep-alive session per worker process. Every TMDB call goes
+# through get() so the TCP+TLS handshake is paid once per connection instead
+# of once per request.
+POOL_SIZE = int(os.environ.get('TMDB_POOL_SIZE', '10'))
+CONNECT_TIMEOUT = float(os.environ.get('TMDB_CONNECT_TIMEOUT', '3.05'))
+READ_TIMEOUT = float(os.environ.get('TMDB_READ_TIMEOUT', '10'))
+
+_session = None
+_session_lock = threading.Lock()
+
+_local = threading.local()
+
+_stats_lock = threading.Lock()
+stats = {
+    'requests': 0,
+    'errors': 0,
+    'total_seconds': 0.0,
+    'last_seconds': 0.0,
+}
+
+
+def get_session():
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                session.headers.update({
+                    'Accept': 'application/json',
+                    'Accept-Encoding': 'gzip, deflate',
+                    'Connection': 'keep-alive',
+                })
+                _session = session
+    return _session
+
+
+_ID_SEGMENT = re.compile(r'/(movie|tv|person|collection|season|episode)/\d+(?=/|$)')
+
+
+def endpoint_label(url):
+    # "https://api.themoviedb.org/3/movie/27205" -> "/3/movie/:id"
+    path = '/' + url.split('://', 1)[-1].partition('/')[2].partition('?')[0]
+    return _ID_SEGMENT.sub(r'/\1/:id', path)
+
+
+def _record(elapsed, failed=False):
+    _local.calls = getattr(_local, 'calls', 0) + 1
+    _local.seconds = getattr(_local, 'seconds', 0.0) + elapsed
+    with _stats_lock:
+        stats['requests'] += 1
+        stats['total_seconds'] += elapsed
+        stats['last_seconds'] = elapsed
+        if failed:
+            stats['errors'] += 1
+
+
+def get(url, params=None):
+    start = time.perf_counter()
+    try:
+        response = get_session().get(url, params=params, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+    except requests.RequestException:
+        elapsed = time.perf_counter() - start
+        _record(elapsed, failed=True)
+        metrics.observe_upstream(endpoint_label(url), elapsed)
+        raise
+    elapsed = time.perf_counter() - start
+    response.upstream_seconds = elapsed
+    _record(elapsed, failed=response.status_code >= 500)
+    metrics.observe_upstream(endpoint_label(url), elapsed, response.status_code, len(response.content))
+    return response
+
+
+def json_body(response):
+    """Parsed body of a 200 response, or None if TMDB answered 404.
+
+    Any other status (429, 5xx) raises requests.HTTPError, so callers can
+    tell "TMDB has no such title" apart from a failed call.
+    """
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    return json_codec.response_json(response)
+
+
+def reset_timing():
+    _local.calls = 0
+    _local.seconds = 0.0
+
+
+def current_timing():
+    # Upstream calls and time spent on this thread since the last reset_timing()
+    return getattr(_local, 'calls', 0), getattr(_local, 'seconds', 0.0)
+
+
+def add_timing(calls, seconds):
+    # Credit calls made on a worker thread to this thread's request
+    _local.calls = getattr(_local, 'calls', 0) + calls
+    _local.seconds = getattr(_local, 'seconds', 0.0) + seconds
+
+
+def snapshot():
+    with _stats_lock:
+        data = dict(stats)
+    data['mean_seconds'] = data['total_seconds'] / data['requests'] if data['requests'] else 0.0
+    return data